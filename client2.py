@@ -2,46 +2,63 @@
 
 import asyncio
 import aiohttp
+import functools
+import hashlib
+import itertools
 import json
+import logging
 import os
+import re
 import signal
 import sys
 import time
-import uuid
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, FrozenSet, List, Optional, Any, Sequence, Tuple
 from datetime import datetime
 
+from mcp_utils import LazyJSON, ainput, json_dumps, json_loads, json_pretty
+
 try:
     import groq
     GROQ_AVAILABLE = True
 except ImportError:
     GROQ_AVAILABLE = False
 
+try:
+    from cachetools import TTLCache
+    CACHETOOLS_AVAILABLE = True
+except ImportError:
+    CACHETOOLS_AVAILABLE = False
 
-class GroqClient:
-    """Enhanced Groq client for AI-powered analysis"""
-    
-    def __init__(self, api_key: str = None):
-        self.api_key = api_key or os.getenv("GROQ_API_KEY")
-        if not self.api_key or not GROQ_AVAILABLE:
-            print("⚠️ Warning: No Groq API key provided or groq package not installed. Using fallback analysis.")
-            self.client = None
-        else:
-            self.client = groq.Groq(api_key=self.api_key)
-        self.model = "llama3-70b-8192"
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
 
-    async def analyze_query(self, user_query: str, available_tools: List[str]) -> Dict[str, Any]:
-        """Analyze user query and suggest appropriate tools"""
-        if not self.client:
-            return self._fallback_analysis(user_query, available_tools)
-        
-        try:
-            tools_list = ", ".join(available_tools)
-            prompt = f"""
+try:
+    from prompt_toolkit import PromptSession
+    PROMPT_TOOLKIT_AVAILABLE = True
+except ImportError:
+    PROMPT_TOOLKIT_AVAILABLE = False
+
+logger = logging.getLogger("fastmcp-client")
+
+# Tools that are safe to call speculatively: read-only, so a discarded call has no side effects
+SPECULATIVE_TOOLS = frozenset({
+    "calculator", "weather_info", "currency_converter", "time_info", "text_analyzer",
+    "list_tables", "describe_table", "count_records", "table_sample"
+})
+SPECULATION_CONFIDENCE = 0.8
+
+# Seconds between background tool-list refreshes in interactive mode
+TOOLS_REFRESH_INTERVAL = 60
+
+# Tool-selection prompt sent to Groq; filled with the query and tool list per call
+_PROMPT_TMPL = """
             Analyze this user query and determine the best approach:
             
-            Query: "{user_query}"
-            Available tools: {tools_list}
+            Query: "{q}"
+            Available tools: {t}
             
             Priority order:
             1. API tools (calculator, weather_info, currency_converter, time_info, text_analyzer)
@@ -57,8 +74,185 @@ class GroqClient:
                 "alternative_tools": ["tool1", "tool2"]
             }}
             """
+
+# Parameter extraction helpers, compiled once at import
+_MATH_RE = re.compile(r'[0-9+\-*/().\s]+')
+# Word tokens; dotted names ("dbo.orders") and names starting with a digit stay whole
+_TOK_RE = re.compile(r"\w+(?:\.\w+)*")
+_CURRENCIES = frozenset({"USD", "EUR", "INR", "GBP"})
+_CITY_MARKERS = frozenset({"in", "for", "of"})
+_DESC_STOP = frozenset({"describe", "table", "structure", "of", "the"})
+_COUNT_STOP = frozenset({"count", "how", "many", "records", "in", "the"})
+_SAMPLE_STOP = frozenset({"sample", "from", "show", "me", "data", "the"})
+
+# Deterministic routes that can be resolved without asking Groq
+_MATH_ONLY_RE = re.compile(r'^\s*(?=[^\d]*\d)[\d+\-*/().\s]+$')
+# Only "weather [forecast] in <place>" with nothing after the place; a city is
+# up to three plain words, none of them a time word, preposition, article or
+# pronoun. The place must also be capitalized or a known city (see prefilter),
+# so generic phrases like "weather in my area" still go to the LLM.
+_CITY_WORD = (
+    r"(?!(?:today|tomorrow|tonight|now|this|next|week|weekend|in|for|of|at|on"
+    r"|the|a|an|my|our|your|their|his|her|its|that|these|those|here|there)\b)"
+    r"[A-Za-z][A-Za-z'-]*"
+)
+# Cities the server's weather_info has data for, accepted in any case
+_KNOWN_CITIES = frozenset({"mumbai", "delhi", "bangalore", "chennai", "kolkata"})
+_WEATHER_RE = re.compile(
+    r'^\s*(?:weather|temperature)(?:\s+(?:forecast|report|like))?\s+(?:in|for|of)\s+'
+    rf'({_CITY_WORD}(?:\s+{_CITY_WORD}){{0,2}})\s*\??\s*$',
+    re.I,
+)
+_CONVERT_RE = re.compile(r'^\s*convert\s+(\d+(?:\.\d+)?)\s*([A-Za-z]{3})\s+(?:to|in|into)\s+([A-Za-z]{3})\s*\??\s*$', re.I)
+_LIST_TABLES_RE = re.compile(r'^\s*(?:list|show)\s+(?:all\s+)?tables\s*\??\s*$', re.I)
+
+
+def _first_token_outside(tokens: List[str], tokens_lower: List[str], stopwords: frozenset) -> Optional[str]:
+    """Return the first token whose lowercase form is not a stopword"""
+    for token, lowered in zip(tokens, tokens_lower):
+        if lowered not in stopwords:
+            return token
+    return None
+
+
+# API tool patterns with better matching
+_API_PATTERNS = {
+    "calculator": ["calculate", "math", "compute", "+", "-", "*", "/", "=", "plus", "minus", "multiply", "divide", "solve", "?"],
+    "weather_info": ["weather", "temperature", "climate", "forecast", "rain", "sunny", "cloudy", "humidity"],
+    "currency_converter": ["convert", "currency", "exchange", "rate", "usd", "eur", "inr", "gbp", "dollar"],
+    "time_info": ["time", "date", "today", "now", "when", "clock", "current"],
+    "text_analyzer": ["analyze", "text", "words", "count", "characters", "sentences", "paragraphs"]
+}
+
+# Database tool patterns
+_DB_PATTERNS = {
+    "list_tables": ["tables", "list", "show tables", "what tables", "available tables", "database tables"],
+    "describe_table": ["describe", "structure", "columns", "schema", "table structure", "fields", "customer", "customers"],
+    "execute_query": ["select", "query", "sql", "from", "where", "join", "group by", "get", "find", "all"],
+    "count_records": ["count", "how many", "number of", "total", "records", "rows"],
+    "table_sample": ["sample", "example", "few", "preview", "show me", "data"]
+}
+
+# Scoring order: API tools first (higher priority), then database tools
+_PATTERNS = (("api", _API_PATTERNS), ("database", _DB_PATTERNS))
+_API_TOOLS = frozenset(_API_PATTERNS)
+
+# Inverted index keyword -> [(tool, tool_type)], built once at import
+_KW_INDEX: Dict[str, List[Tuple[str, str]]] = {}
+for _tool_type, _patterns in _PATTERNS:
+    for _tool, _keywords in _patterns.items():
+        for _keyword in _keywords:
+            _KW_INDEX.setdefault(_keyword, []).append((_tool, _tool_type))
+
+
+def _build_automaton():
+    """Build one Aho-Corasick automaton over every tool keyword"""
+    automaton = ahocorasick.Automaton()
+    for keyword, hits in _KW_INDEX.items():
+        automaton.add_word(keyword, (keyword, hits))
+    automaton.make_automaton()
+    return automaton
+
+
+_KW_AUTOMATON = _build_automaton() if AHOCORASICK_AVAILABLE else None
+
+
+@functools.lru_cache(maxsize=1024)
+def _score_tools(query_lower: str) -> Tuple[Tuple[str, int], ...]:
+    """Count distinct keyword hits per tool as (tool, score) pairs, memoized per query"""
+    if _KW_AUTOMATON is not None:
+        # Single scan of the query; a keyword occurring twice still counts once
+        matched = {keyword for _, (keyword, _) in _KW_AUTOMATON.iter(query_lower)}
+    else:
+        matched = [keyword for keyword in _KW_INDEX if keyword in query_lower]
+    
+    scores: Dict[str, int] = {}
+    for keyword in matched:
+        for tool, _ in _KW_INDEX[keyword]:
+            scores[tool] = scores.get(tool, 0) + 1
+    
+    return tuple(scores.items())
+
+
+class GroqClient:
+    """Enhanced Groq client for AI-powered analysis"""
+    
+    def __init__(self, api_key: str = None, cache_size: int = 1024, cache_ttl: float = 600):
+        self.api_key = api_key or os.getenv("GROQ_API_KEY")
+        if not self.api_key or not GROQ_AVAILABLE:
+            print("⚠️ Warning: No Groq API key provided or groq package not installed. Using fallback analysis.")
+            self.client = None
+        else:
+            self.client = groq.AsyncGroq(api_key=self.api_key)
+        self.model = "llama3-70b-8192"
+        # Exact-match cache of Groq analyses so repeated queries skip the round-trip
+        self._analysis_cache = TTLCache(maxsize=cache_size, ttl=cache_ttl) if CACHETOOLS_AVAILABLE else None
+
+    @staticmethod
+    def _cache_key(user_query: str, tools_list: str) -> str:
+        """Hash the query together with the tool list it was analyzed against"""
+        raw = user_query + "|" + tools_list
+        return hashlib.md5(raw.encode()).hexdigest()
+
+    def prefilter(self, user_query: str, available_tools: Sequence[str],
+                  tool_set: Optional[FrozenSet[str]] = None) -> Optional[Dict[str, Any]]:
+        """Resolve unambiguous queries locally, or return None to fall through to analysis"""
+        tool = None
+        parameters: Dict[str, Any] = {}
+        
+        if _MATH_ONLY_RE.match(user_query):
+            tool = "calculator"
+            parameters["expression"] = user_query.strip()
+        elif (match := _WEATHER_RE.match(user_query)) and (
+            match.group(1)[0].isupper() or match.group(1).lower() in _KNOWN_CITIES
+        ):
+            tool = "weather_info"
+            parameters["city"] = match.group(1)
+        elif (match := _CONVERT_RE.match(user_query)):
+            tool = "currency_converter"
+            parameters["amount"] = float(match.group(1))
+            parameters["from_currency"] = match.group(2).upper()
+            parameters["to_currency"] = match.group(3).upper()
+        elif _LIST_TABLES_RE.match(user_query):
+            tool = "list_tables"
+        
+        if tool is None or tool not in (tool_set if tool_set is not None else available_tools):
+            return None
+        
+        return {
+            "tool_type": "api" if tool in _API_TOOLS else "database",
+            "recommended_tool": tool,
+            "confidence": 0.95,
+            "reasoning": "Matched a deterministic query pattern",
+            "parameters": parameters,
+            "alternative_tools": [t for t in available_tools if t != tool][:3]
+        }
+    
+    async def analyze_query(self, user_query: str, available_tools: Sequence[str],
+                            tool_set: Optional[FrozenSet[str]] = None,
+                            tools_list: Optional[str] = None) -> Dict[str, Any]:
+        """Analyze user query and suggest appropriate tools
+        
+        ``tool_set`` and ``tools_list`` are precomputed forms of ``available_tools``;
+        callers that analyze many queries against the same tools should pass them.
+        """
+        if not self.client:
+            return self._fallback_analysis(user_query, available_tools, tool_set)
+        
+        if tools_list is None:
+            tools_list = ", ".join(available_tools)
+        
+        cache_key = None
+        if self._analysis_cache is not None:
+            cache_key = self._cache_key(user_query, tools_list)
+            cached = self._analysis_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        try:
+            prompt = _PROMPT_TMPL.format(q=user_query, t=tools_list)
             
-            response = self.client.chat.completions.create(
+            response = await self.client.chat.completions.create(
                 messages=[
                     {"role": "system", "content": "You are a tool selection expert. Always respond with valid JSON."},
                     {"role": "user", "content": prompt}
@@ -70,55 +264,43 @@ class GroqClient:
             
             result = response.choices[0].message.content
             try:
-                return json.loads(result)
+                analysis = json_loads(result)
             except json.JSONDecodeError:
-                return self._fallback_analysis(user_query, available_tools)
+                return self._fallback_analysis(user_query, available_tools, tool_set)
+            
+            if cache_key is not None:
+                self._analysis_cache[cache_key] = analysis
+            return analysis
                 
         except Exception as e:
             print(f"⚠️ Groq analysis failed: {e}")
-            return self._fallback_analysis(user_query, available_tools)
+            return self._fallback_analysis(user_query, available_tools, tool_set)
     
-    def _fallback_analysis(self, user_query: str, available_tools: List[str]) -> Dict[str, Any]:
+    def _fallback_analysis(self, user_query: str, available_tools: Sequence[str],
+                           tool_set: Optional[FrozenSet[str]] = None) -> Dict[str, Any]:
         """Fallback analysis when Groq is not available"""
+        if tool_set is None:
+            tool_set = frozenset(available_tools)
         query_lower = user_query.lower()
+        # Word tokens (original case) with their lowercase forms, shared by the extractors below
+        tokens = _TOK_RE.findall(user_query)
+        tokens_lower = [token.lower() for token in tokens]
         
-        # API tool patterns with better matching
-        api_patterns = {
-            "calculator": ["calculate", "math", "compute", "+", "-", "*", "/", "=", "plus", "minus", "multiply", "divide", "solve", "?"],
-            "weather_info": ["weather", "temperature", "climate", "forecast", "rain", "sunny", "cloudy", "humidity"],
-            "currency_converter": ["convert", "currency", "exchange", "rate", "usd", "eur", "inr", "gbp", "dollar"],
-            "time_info": ["time", "date", "today", "now", "when", "clock", "current"],
-            "text_analyzer": ["analyze", "text", "words", "count", "characters", "sentences", "paragraphs"]
-        }
-        
-        # Database tool patterns
-        db_patterns = {
-            "list_tables": ["tables", "list", "show tables", "what tables", "available tables", "database tables"],
-            "describe_table": ["describe", "structure", "columns", "schema", "table structure", "fields", "customer", "customers"],
-            "execute_query": ["select", "query", "sql", "from", "where", "join", "group by", "get", "find", "all"],
-            "count_records": ["count", "how many", "number of", "total", "records", "rows"],
-            "table_sample": ["sample", "example", "few", "preview", "show me", "data"]
-        }
+        scores = dict(_score_tools(query_lower))
         
-        # Check API tools first (higher priority)
+        # Check API tools first (higher priority), in declaration order so ties keep the earlier tool
         best_match = None
         best_score = 0
         
-        for tool, patterns in api_patterns.items():
-            if tool in available_tools:
-                score = sum(1 for pattern in patterns if pattern in query_lower)
-                if score > best_score:
+        for _, patterns in _PATTERNS:
+            for tool in patterns:
+                score = scores.get(tool, 0)
+                if score > best_score and tool in tool_set:
                     best_score = score
                     best_match = tool
-        
-        # If no API match, check database tools
-        if best_match is None:
-            for tool, patterns in db_patterns.items():
-                if tool in available_tools:
-                    score = sum(1 for pattern in patterns if pattern in query_lower)
-                    if score > best_score:
-                        best_score = score
-                        best_match = tool
+            # If no API match, check database tools
+            if best_match is not None:
+                break
         
         # Default to first available tool if no match
         if best_match is None and available_tools:
@@ -128,22 +310,25 @@ class GroqClient:
         parameters = {}
         if best_match == "calculator":
             # Extract mathematical expression
-            import re
-            math_pattern = r'[0-9+\-*/().\s]+'
-            matches = re.findall(math_pattern, user_query)
-            if matches:
-                parameters["expression"] = max(matches, key=len).strip()
+            # Keep the longest match in one pass rather than building the match list
+            longest = None
+            longest_len = 0
+            for match in _MATH_RE.finditer(user_query):
+                span = match.end() - match.start()
+                if span > longest_len:
+                    longest_len = span
+                    longest = match.group()
+            if longest is not None:
+                parameters["expression"] = longest.strip()
             else:
                 parameters["expression"] = user_query
         
         elif best_match == "weather_info":
             # Extract city name
-            words = user_query.split()
-            for i, word in enumerate(words):
-                if word.lower() in ["in", "for", "of"]:
-                    if i + 1 < len(words):
-                        parameters["city"] = words[i + 1]
-                        break
+            for i, token in enumerate(tokens_lower):
+                if token in _CITY_MARKERS and i + 1 < len(tokens):
+                    parameters["city"] = tokens[i + 1]
+                    break
             if "city" not in parameters:
                 parameters["city"] = "Mumbai"  # Default
         
@@ -157,7 +342,7 @@ class GroqClient:
             for word in words:
                 if word.replace('.', '').isdigit():
                     amount = float(word)
-                elif word.upper() in ["USD", "EUR", "INR", "GBP"]:
+                elif word.upper() in _CURRENCIES:
                     if from_curr is None:
                         from_curr = word.upper()
                     else:
@@ -176,13 +361,7 @@ class GroqClient:
         
         elif best_match == "describe_table":
             # Extract table name
-            words = user_query.split()
-            table_name = None
-            for word in words:
-                if word.lower() not in ["describe", "table", "structure", "of", "the"]:
-                    table_name = word
-                    break
-            parameters["table_name"] = table_name or "customers"
+            parameters["table_name"] = _first_token_outside(tokens, tokens_lower, _DESC_STOP) or "customers"
         
         elif best_match == "execute_query":
             # Use the query as SQL
@@ -190,27 +369,15 @@ class GroqClient:
         
         elif best_match == "count_records":
             # Extract table name
-            words = user_query.split()
-            table_name = None
-            for word in words:
-                if word.lower() not in ["count", "how", "many", "records", "in", "the"]:
-                    table_name = word
-                    break
-            parameters["table_name"] = table_name or "customers"
+            parameters["table_name"] = _first_token_outside(tokens, tokens_lower, _COUNT_STOP) or "customers"
         
         elif best_match == "table_sample":
             # Extract table name
-            words = user_query.split()
-            table_name = None
-            for word in words:
-                if word.lower() not in ["sample", "from", "show", "me", "data", "the"]:
-                    table_name = word
-                    break
-            parameters["table_name"] = table_name or "customers"
+            parameters["table_name"] = _first_token_outside(tokens, tokens_lower, _SAMPLE_STOP) or "customers"
             parameters["sample_size"] = 5
         
         return {
-            "tool_type": "api" if best_match in api_patterns else "database",
+            "tool_type": "api" if best_match in _API_TOOLS else "database",
             "recommended_tool": best_match or "calculator",
             "confidence": min(best_score / 5.0, 1.0),
             "reasoning": f"Pattern matching found {best_score} keywords",
@@ -225,15 +392,34 @@ class FastMCPClient:
     def __init__(self, server_url: str = "http://localhost:8000", debug: bool = True):
         self.server_url = server_url.rstrip('/')
         self.session = None
-        self.connection_id = str(uuid.uuid4())
         self.groq_client = GroqClient()
-        self.available_tools = []
+        self.available_tools: Tuple[str, ...] = ()
+        self._available_set: FrozenSet[str] = frozenset()
+        self._tools_list_str = ""
+        self._request_ids = itertools.count(1)
         self.running = False
         self.debug = debug
+    
+    @property
+    def debug(self) -> bool:
+        return self._debug
+    
+    @debug.setter
+    def debug(self, enabled: bool):
+        # Debug output goes through the logger so payloads are only formatted when it is enabled
+        self._debug = enabled
+        logger.setLevel(logging.DEBUG if enabled else logging.INFO)
         
     async def __aenter__(self):
         """Async context manager entry"""
-        self.session = aiohttp.ClientSession()
+        # Pool keep-alive connections to the server and cache its DNS lookup
+        connector = aiohttp.TCPConnector(
+            limit=64,
+            limit_per_host=32,
+            ttl_dns_cache=300,
+            keepalive_timeout=75
+        )
+        self.session = aiohttp.ClientSession(connector=connector, json_serialize=json_dumps)
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
@@ -264,25 +450,44 @@ class FastMCPClient:
             print(f"❌ Connection failed: {e}")
             return False
     
-    async def fetch_tools(self):
-        """Fetch available tools from server"""
+    async def fetch_tools(self, quiet: bool = False):
+        """Fetch available tools from server; ``quiet`` reports only through the debug logger"""
         try:
             async with self.session.get(f"{self.server_url}/tools") as response:
                 if response.status == 200:
                     tools_data = await response.json()
-                    self.available_tools = [tool["name"] for tool in tools_data["tools"]]
-                    print(f"🔧 Available tools: {', '.join(self.available_tools)}")
+                    self._set_tools(tool["name"] for tool in tools_data["tools"])
+                    if not quiet:
+                        print(f"🔧 Available tools: {self._tools_list_str}")
+                elif quiet:
+                    logger.debug("⚠️ Failed to fetch tools: %s", response.status)
                 else:
                     print(f"⚠️ Failed to fetch tools: {response.status}")
         except Exception as e:
-            print(f"⚠️ Error fetching tools: {e}")
+            # Background refreshes must not write over the user's prompt
+            if quiet:
+                logger.debug("⚠️ Error fetching tools: %s", e)
+            else:
+                print(f"⚠️ Error fetching tools: {e}")
+    
+    async def _refresh_tools_loop(self):
+        """Keep the tool list fresh while the user is typing"""
+        while True:
+            await asyncio.sleep(TOOLS_REFRESH_INTERVAL)
+            await self.fetch_tools(quiet=True)
+    
+    def _set_tools(self, names):
+        """Store the tool names along with their set and display forms"""
+        self.available_tools = tuple(names)
+        self._available_set = frozenset(self.available_tools)
+        self._tools_list_str = ", ".join(self.available_tools)
     
     async def call_tool(self, tool_name: str, **kwargs) -> Dict[str, Any]:
         """Call a tool on the server"""
         try:
             request_data = {
                 "jsonrpc": "2.0",
-                "id": int(time.time()),
+                "id": next(self._request_ids),
                 "method": "tools/call",
                 "params": {
                     "name": tool_name,
@@ -290,25 +495,24 @@ class FastMCPClient:
                 }
             }
             
-            if self.debug:
-                print(f"🔧 Sending request: {json.dumps(request_data, indent=2)}")
+            logger.debug("🔧 Sending request: %s", LazyJSON(request_data))
             
             async with self.session.post(
                 f"{self.server_url}/mcp",
                 json=request_data,
                 headers={"Content-Type": "application/json"}
             ) as response:
-                response_text = await response.text()
+                # Parse the body straight from bytes; only decode to str for display
+                raw_body = await response.read()
                 
-                if self.debug:
-                    print(f"📥 Raw response ({response.status}): {response_text}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("📥 Raw response (%s): %s", response.status, raw_body.decode("utf-8", "replace"))
                 
                 if response.status == 200:
                     try:
-                        result = json.loads(response_text)
+                        result = json_loads(raw_body)
                         
-                        if self.debug:
-                            print(f"📋 Parsed response: {json.dumps(result, indent=2)}")
+                        logger.debug("📋 Parsed response: %s", LazyJSON(result))
                         
                         if "error" in result and result["error"]:
                             return {"error": result["error"]["message"]}
@@ -317,9 +521,9 @@ class FastMCPClient:
                         else:
                             return {"error": "Unexpected response format", "raw": result}
                     except json.JSONDecodeError as e:
-                        return {"error": f"JSON decode error: {e}", "raw": response_text}
+                        return {"error": f"JSON decode error: {e}", "raw": raw_body.decode("utf-8", "replace")}
                 else:
-                    return {"error": f"HTTP {response.status}: {response_text}"}
+                    return {"error": f"HTTP {response.status}: {raw_body.decode('utf-8', 'replace')}"}
                     
         except Exception as e:
             return {"error": f"Request failed: {str(e)}"}
@@ -362,12 +566,46 @@ class FastMCPClient:
         result = await self.test_direct_call("list_tables")
         print(f"Result: {result}")
     
+    def _local_guess(self, user_query: str) -> Optional[Dict[str, Any]]:
+        """Return a confident local analysis worth dispatching before Groq answers"""
+        if self.groq_client.client is None:
+            # Without Groq the fallback analysis is the final answer anyway
+            return None
+        
+        guess = self.groq_client._fallback_analysis(user_query, self.available_tools, self._available_set)
+        if guess["confidence"] < SPECULATION_CONFIDENCE or guess["recommended_tool"] not in SPECULATIVE_TOOLS:
+            return None
+        return guess
+    
     async def intelligent_query(self, user_query: str) -> Dict[str, Any]:
         """Process user query with intelligent tool selection"""
         print(f"\n🤔 Analyzing query: '{user_query}'")
         
-        # Analyze query with Groq or fallback
-        analysis = await self.groq_client.analyze_query(user_query, self.available_tools)
+        # Resolve obvious routes locally, otherwise analyze with Groq or fallback
+        speculative_call = None
+        analysis = self.groq_client.prefilter(user_query, self.available_tools, self._available_set)
+        if analysis is None:
+            guess = self._local_guess(user_query)
+            if guess is not None:
+                # Start the likely tool call now so it overlaps the Groq round-trip
+                speculative_call = asyncio.create_task(
+                    self.call_tool(guess["recommended_tool"], **guess["parameters"])
+                )
+            try:
+                analysis = await self.groq_client.analyze_query(
+                    user_query, self.available_tools, self._available_set, self._tools_list_str
+                )
+            except BaseException:
+                if speculative_call is not None:
+                    speculative_call.cancel()
+                raise
+            
+            if speculative_call is not None and (
+                analysis.get("recommended_tool") != guess["recommended_tool"]
+                or analysis.get("parameters") != guess["parameters"]
+            ):
+                speculative_call.cancel()
+                speculative_call = None
         
         print(f"🎯 Analysis result:")
         print(f"   Tool: {analysis['recommended_tool']}")
@@ -380,7 +618,10 @@ class FastMCPClient:
         
         print(f"⚡ Executing {tool_name} with parameters: {parameters}")
         
-        result = await self.call_tool(tool_name, **parameters)
+        if speculative_call is not None:
+            result = await speculative_call
+        else:
+            result = await self.call_tool(tool_name, **parameters)
         
         return {
             "query": user_query,
@@ -388,6 +629,26 @@ class FastMCPClient:
             "result": result
         }
     
+    async def intelligent_query_batch(self, queries: List[str]) -> List[Dict[str, Any]]:
+        """Process several queries concurrently (analyses first, then tool calls)"""
+        print(f"\n🤔 Analyzing {len(queries)} queries...")
+        
+        analyses = await asyncio.gather(
+            *[
+                self.groq_client.analyze_query(query, self.available_tools, self._available_set, self._tools_list_str)
+                for query in queries
+            ]
+        )
+        
+        results = await asyncio.gather(
+            *[self.call_tool(analysis["recommended_tool"], **analysis["parameters"]) for analysis in analyses]
+        )
+        
+        return [
+            {"query": query, "analysis": analysis, "result": result}
+            for query, analysis, result in zip(queries, analyses, results)
+        ]
+    
     async def interactive_mode(self):
         """Interactive command-line mode"""
         print("\n🚀 FastMCP Interactive Client")
@@ -403,83 +664,93 @@ class FastMCPClient:
         
         self.running = True
         
-        while self.running:
-            try:
-                user_input = input("\n💬 Query: ").strip()
-                
-                if not user_input:
-                    continue
-                
-                if user_input.lower() in ['quit', 'exit', 'q']:
-                    print("👋 Goodbye!")
-                    break
-                
-                elif user_input.lower() == 'tools':
-                    print(f"🔧 Available tools: {', '.join(self.available_tools)}")
-                    continue
-                
-                elif user_input.lower() == 'debug':
-                    self.debug = not self.debug
-                    print(f"🔧 Debug mode: {'ON' if self.debug else 'OFF'}")
-                    continue
-                
-                elif user_input.lower() == 'test':
-                    await self.simple_tool_test()
-                    continue
-                
-                elif user_input.lower() == 'help':
-                    print("\n📖 Help:")
-                    print("  • Calculator: '2 + 2', 'sqrt(16)', 'cos(0)'")
-                    print("  • Weather: 'weather in Mumbai', 'temperature in Delhi'")
-                    print("  • Currency: 'convert 100 USD to INR'")
-                    print("  • Time: 'current time', 'what time is it'")
-                    print("  • Text: 'analyze this text'")
-                    print("  • Database: 'list tables', 'describe customers', 'select * from orders'")
-                    continue
-                
-                # Process the query
-                start_time = time.time()
-                response = await self.intelligent_query(user_input)
-                end_time = time.time()
-                
-                # Display results
-                print(f"\n📊 Results (took {end_time - start_time:.2f}s):")
-                print("-" * 40)
-                
-                if "error" in response["result"]:
-                    print(f"❌ Error: {response['result']['error']}")
-                    if "raw" in response["result"]:
-                        print(f"🔍 Raw response: {response['result']['raw']}")
-                else:
-                    # Handle different response formats
-                    result_data = response["result"]
+        # Read input without blocking the loop so background tasks keep running
+        prompt_session = PromptSession() if PROMPT_TOOLKIT_AVAILABLE else None
+        refresh_task = asyncio.create_task(self._refresh_tools_loop())
+        
+        try:
+            while self.running:
+                try:
+                    if prompt_session is not None:
+                        user_input = (await prompt_session.prompt_async("\n💬 Query: ")).strip()
+                    else:
+                        user_input = (await ainput("\n💬 Query: ")).strip()
+                    
+                    if not user_input:
+                        continue
+                    
+                    if user_input.lower() in ['quit', 'exit', 'q']:
+                        print("👋 Goodbye!")
+                        break
                     
-                    if isinstance(result_data, dict):
-                        if "content" in result_data and result_data["content"]:
-                            # Standard MCP format
-                            if isinstance(result_data["content"], list) and len(result_data["content"]) > 0:
-                                content = result_data["content"][0].get("text", str(result_data["content"][0]))
-                                print(content)
+                    elif user_input.lower() == 'tools':
+                        print(f"🔧 Available tools: {self._tools_list_str}")
+                        continue
+                    
+                    elif user_input.lower() == 'debug':
+                        self.debug = not self.debug
+                        print(f"🔧 Debug mode: {'ON' if self.debug else 'OFF'}")
+                        continue
+                    
+                    elif user_input.lower() == 'test':
+                        await self.simple_tool_test()
+                        continue
+                    
+                    elif user_input.lower() == 'help':
+                        print("\n📖 Help:")
+                        print("  • Calculator: '2 + 2', 'sqrt(16)', 'cos(0)'")
+                        print("  • Weather: 'weather in Mumbai', 'temperature in Delhi'")
+                        print("  • Currency: 'convert 100 USD to INR'")
+                        print("  • Time: 'current time', 'what time is it'")
+                        print("  • Text: 'analyze this text'")
+                        print("  • Database: 'list tables', 'describe customers', 'select * from orders'")
+                        continue
+                    
+                    # Process the query
+                    start_time = time.time()
+                    response = await self.intelligent_query(user_input)
+                    end_time = time.time()
+                    
+                    # Display results
+                    print(f"\n📊 Results (took {end_time - start_time:.2f}s):")
+                    print("-" * 40)
+                    
+                    if "error" in response["result"]:
+                        print(f"❌ Error: {response['result']['error']}")
+                        if "raw" in response["result"]:
+                            print(f"🔍 Raw response: {response['result']['raw']}")
+                    else:
+                        # Handle different response formats
+                        result_data = response["result"]
+                        
+                        if isinstance(result_data, dict):
+                            if "content" in result_data and result_data["content"]:
+                                # Standard MCP format
+                                if isinstance(result_data["content"], list) and len(result_data["content"]) > 0:
+                                    content = result_data["content"][0].get("text", str(result_data["content"][0]))
+                                    print(content)
+                                else:
+                                    print(str(result_data["content"]))
                             else:
-                                print(str(result_data["content"]))
+                                # Direct result format
+                                print(json_pretty(result_data))
                         else:
-                            # Direct result format
-                            print(json.dumps(result_data, indent=2))
-                    else:
-                        # Simple string or other format
-                        print(str(result_data))
-                
-                # Show alternatives if confidence is low
-                if response["analysis"]["confidence"] < 0.5:
-                    alternatives = response["analysis"]["alternative_tools"]
-                    if alternatives:
-                        print(f"\n💡 Other tools you might try: {', '.join(alternatives)}")
-                
-            except KeyboardInterrupt:
-                print("\n\n👋 Goodbye!")
-                break
-            except Exception as e:
-                print(f"❌ Error: {e}")
+                            # Simple string or other format
+                            print(str(result_data))
+                    
+                    # Show alternatives if confidence is low
+                    if response["analysis"]["confidence"] < 0.5:
+                        alternatives = response["analysis"]["alternative_tools"]
+                        if alternatives:
+                            print(f"\n💡 Other tools you might try: {', '.join(alternatives)}")
+                    
+                except (KeyboardInterrupt, EOFError):
+                    print("\n\n👋 Goodbye!")
+                    break
+                except Exception as e:
+                    print(f"❌ Error: {e}")
+        finally:
+            refresh_task.cancel()
     
     def stop(self):
         """Stop the client"""
@@ -500,6 +771,8 @@ async def main():
     server_url = os.getenv("FASTMCP_SERVER_URL", "http://localhost:8000")
     debug_mode = os.getenv("DEBUG", "false").lower() == "true"
     
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
+    
     print("🌟 FastMCP Client Starting...")
     print(f"🌐 Server URL: {server_url}")
     print(f"🔧 Debug Mode: {'ON' if debug_mode else 'OFF'}")
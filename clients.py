@@ -1,12 +1,17 @@
 import asyncio
 import os
 import logging
-from typing import List, Tuple
+from contextlib import AsyncExitStack
+from functools import lru_cache
+from typing import List, Optional, Tuple
 from pydantic_ai import Agent
 from pydantic_ai.mcp import MCPServerSSE
+from pydantic_ai.messages import ToolCallPart
 from dotenv import load_dotenv
 import logfire
 
+from mcp_utils import ainput
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -22,10 +27,46 @@ load_dotenv()
 GROQ_API_KEY = os.environ.get("GROQ_API_KEY")
 MCP_SERVER_URL = "http://localhost:8000/sse"
 
-async def chat_with_agent(prompt: str) -> Tuple[List[str], str]:
+@lru_cache(maxsize=1)
+def get_agent() -> Agent:
+    """Build the MCP-backed agent once and reuse it across chat turns"""
+    server = MCPServerSSE(url=MCP_SERVER_URL)
+    return Agent(
+        model="groq:llama3-70b-8192",
+        api_key=GROQ_API_KEY,
+        mcp_servers=[server]
+    )
+
+class MCPConnection:
+    """Keeps ``get_agent().run_mcp_servers()`` open across chat turns.
+    
+    The connection is opened on first use and dropped after a failed turn,
+    so a server that was down or went away is reconnected on the next one.
+    """
+    
+    def __init__(self):
+        self._stack: Optional[AsyncExitStack] = None
+    
+    async def open(self):
+        if self._stack is None:
+            stack = AsyncExitStack()
+            await stack.enter_async_context(get_agent().run_mcp_servers())
+            self._stack = stack
+    
+    async def close(self):
+        stack, self._stack = self._stack, None
+        if stack is not None:
+            try:
+                await stack.aclose()
+            except Exception as e:
+                logger.debug(f"Error closing MCP connection: {str(e)}")
+
+async def chat_with_agent(prompt: str, connection: MCPConnection) -> Tuple[List[str], str]:
     """
     Process user prompt and return tools used with response.
     
+    ``connection`` is shared by every turn; it is (re)opened here when needed.
+    
     Returns:
         Tuple containing:
         - List of tool names used
@@ -35,77 +76,31 @@ async def chat_with_agent(prompt: str) -> Tuple[List[str], str]:
     response = ''
     
     try:
-        server = MCPServerSSE(url=MCP_SERVER_URL)
-        agent = Agent(
-            model="groq:llama3-70b-8192",
-            api_key=GROQ_API_KEY,
-            mcp_servers=[server]
-        )
+        await connection.open()
+        agent_result = await get_agent().run(prompt)
+        
+        # Collect tool calls from the message history
+        for msg in agent_result.all_messages():
+            for part in getattr(msg, 'parts', ()):
+                if isinstance(part, ToolCallPart) and part.tool_name not in tools_used:
+                    tools_used.append(part.tool_name)
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("\n=== DEBUG INFO ===")
+            for i, msg in enumerate(agent_result.all_messages()):
+                logger.debug("Message %d: %s", i, type(msg).__name__)
+                for part in getattr(msg, 'parts', ()):
+                    logger.debug("    %s: %.200s", type(part).__name__, part)
+            logger.debug("Final tools_used: %s", tools_used)
+            logger.debug("=== END DEBUG ===\n")
+        
+        response = agent_result.output
         
-        async with agent.run_mcp_servers():
-            agent_result = await agent.run(prompt)
-            
-            # Check messages for tool calls
-            print(f"\n=== DEBUG INFO ===")
-            
-            # Get messages - they might be methods, so call them
-            try:
-                if hasattr(agent_result, 'all_messages'):
-                    if callable(agent_result.all_messages):
-                        all_messages = agent_result.all_messages()
-                    else:
-                        all_messages = agent_result.all_messages
-                    
-                    print(f"All messages count: {len(all_messages)}")
-                    for i, msg in enumerate(all_messages):
-                        print(f"\nMessage {i}: {type(msg).__name__}")
-                        
-                        # Check the parts attribute for tool calls
-                        if hasattr(msg, 'parts') and msg.parts:
-                            print(f"  Parts count: {len(msg.parts)}")
-                            for j, part in enumerate(msg.parts):
-                                print(f"    Part {j}: {type(part).__name__}")
-                                print(f"    Part {j} attributes: {[attr for attr in dir(part) if not attr.startswith('_')]}")
-                                
-                                # Check if this part is a tool call
-                                if hasattr(part, 'tool_name'):
-                                    tool_name = part.tool_name
-                                    print(f"    Found tool_name: {tool_name}")
-                                    if tool_name not in tools_used:
-                                        tools_used.append(tool_name)
-                                        print(f"    Added tool: {tool_name}")
-                                
-                                # Check for other tool-related attributes
-                                for attr in ['name', 'function_name', 'tool_call_id']:
-                                    if hasattr(part, attr):
-                                        value = getattr(part, attr)
-                                        print(f"    {attr}: {value}")
-                                
-                                # Print the actual part content if it's small
-                                try:
-                                    part_str = str(part)
-                                    if len(part_str) < 200:
-                                        print(f"    Part content: {part_str}")
-                                    else:
-                                        print(f"    Part content: {part_str[:200]}...")
-                                except:
-                                    pass
-                        else:
-                            print(f"  No parts or empty parts")
-                
-            except Exception as e:
-                print(f"Error in debug: {e}")
-                import traceback
-                traceback.print_exc()
-            
-            print(f"\nFinal tools_used: {tools_used}")
-            print(f"=== END DEBUG ===\n")
-            
-            response = agent_result.output
-            
         return tools_used, response
         
     except Exception as e:
+        # The SSE connection may be what failed; reconnect on the next turn
+        await connection.close()
         logger.error(f"Error processing prompt: {str(e)}")
         return [], f"Error occurred: {str(e)}"
 
@@ -114,18 +109,24 @@ async def main():
     print("\n=== Tool-Enabled Chat Agent ===")
     print("Type 'exit' to quit\n")
     
-    while True:
-        user_input = input("You: ").strip()
-        
-        if user_input.lower() in ["exit", "quit", "bye"]:
-            print("\nGoodbye!")
-            break
-        
-        tools_used, response = await chat_with_agent(user_input)
-        
-        # Output as array format
-        result_array = [tools_used, response]
-        print(f"\nResult: {result_array}\n")
+    # Hold the MCP connection open for the whole session instead of per turn
+    connection = MCPConnection()
+    try:
+        while True:
+            # Read off the event loop so the open SSE connection keeps being serviced
+            user_input = (await ainput("You: ")).strip()
+            
+            if user_input.lower() in ["exit", "quit", "bye"]:
+                print("\nGoodbye!")
+                break
+            
+            tools_used, response = await chat_with_agent(user_input, connection)
+            
+            # Output as array format
+            result_array = [tools_used, response]
+            print(f"\nResult: {result_array}\n")
+    finally:
+        await connection.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
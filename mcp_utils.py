@@ -0,0 +1,79 @@
+"""Helpers shared by the MCP clients, agent and server"""
+
+import asyncio
+import json
+import threading
+from typing import Any, Union
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def json_loads(data: Union[str, bytes]) -> Any:
+    """Parse JSON with orjson when available"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumpb(data: Any) -> bytes:
+    """Serialize compact UTF-8 JSON with orjson when available"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def json_dumps(data: Any) -> str:
+    """Compact JSON as text, for APIs that want a str"""
+    return json_dumpb(data).decode("utf-8")
+
+
+def json_pretty(data: Any) -> str:
+    """Pretty-print JSON with orjson when available"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(data, indent=2, ensure_ascii=False)
+
+
+class LazyJSON:
+    """Defer pretty-printing a payload (or encoded frame) until a log record is emitted"""
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: Any):
+        self.data = data
+
+    def __str__(self) -> str:
+        if isinstance(self.data, bytes):
+            # An encoded frame may carry several newline-separated messages
+            return "\n".join(json_pretty(json_loads(line)) for line in self.data.splitlines())
+        return json_pretty(self.data)
+
+
+def ainput(prompt: str) -> "asyncio.Future[str]":
+    """input() on a daemon thread, so the event loop keeps running while the
+    user types. Unlike asyncio.to_thread, an interrupt does not have to wait
+    for the blocked read to be joined on shutdown."""
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def settle(result=None, error=None):
+        if not future.done():
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def read():
+        try:
+            line = input(prompt)
+        except BaseException as error:
+            loop.call_soon_threadsafe(settle, None, error)
+        else:
+            loop.call_soon_threadsafe(settle, line)
+
+    threading.Thread(target=read, name="input-reader", daemon=True).start()
+    return future
@@ -4,7 +4,50 @@ from mcp.server.fastmcp import FastMCP
 
 # Create MCP server
 mcp = FastMCP("Math & Weather Tools", host="0.0.0.0", port=8000)
-http_client = httpx.AsyncClient(timeout=10.0)
+http_client = httpx.AsyncClient(
+    timeout=10.0,
+    limits=httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=75.0)
+)
+
+# Geocoding results (city -> latitude, longitude, resolved name); cities rarely move
+_GEO_CACHE: dict[str, tuple[float, float, str]] = {}
+_GEO_CACHE_MAX = 1024
+# In-flight lookups, so concurrent requests for a new city share one geocoding call
+_GEO_PENDING: dict[str, asyncio.Task] = {}
+
+async def _lookup_city(city: str) -> tuple[float, float, str] | None:
+    """Resolve a city name via the open-meteo geocoding API"""
+    geo_response = await http_client.get(
+        "https://geocoding-api.open-meteo.com/v1/search", params={"name": city}
+    )
+    geo_data = geo_response.json()
+    
+    if not geo_data.get("results"):
+        return None
+    
+    location = geo_data["results"][0]
+    return location["latitude"], location["longitude"], location.get("name", city)
+
+async def _geocode(city: str) -> tuple[float, float, str] | None:
+    """Return cached coordinates for a city, geocoding it at most once"""
+    cache_key = city.strip().lower()
+    cached = _GEO_CACHE.get(cache_key)
+    if cached:
+        return cached
+    
+    task = _GEO_PENDING.get(cache_key)
+    if task is None:
+        task = asyncio.create_task(_lookup_city(city))
+        _GEO_PENDING[cache_key] = task
+        task.add_done_callback(lambda _: _GEO_PENDING.pop(cache_key, None))
+    
+    # Shield so one cancelled caller doesn't cancel the lookup for the others
+    location = await asyncio.shield(task)
+    if location is not None:
+        if len(_GEO_CACHE) >= _GEO_CACHE_MAX:
+            _GEO_CACHE.pop(next(iter(_GEO_CACHE)))
+        _GEO_CACHE[cache_key] = location
+    return location
 
 # Math Tools
 @mcp.tool()
@@ -90,16 +133,10 @@ async def get_weather(city: str) -> str:
         Formatted string with temperature or error message
     """
     try:
-        geo_url = f"https://geocoding-api.open-meteo.com/v1/search?name={city}"
-        geo_response = await http_client.get(geo_url)
-        geo_data = geo_response.json()
-        
-        if not geo_data.get("results"):
+        location = await _geocode(city)
+        if location is None:
             return f"[WEATHER] Error: City '{city}' not found"
-            
-        location = geo_data["results"][0]
-        lat, lon = location["latitude"], location["longitude"]
-        city_name = location.get("name", city)
+        lat, lon, city_name = location
         
         weather_url = f"https://api.open-meteo.com/v1/forecast?latitude={lat}&longitude={lon}&current=temperature_2m"
         weather_response = await http_client.get(weather_url)
@@ -1,45 +1,98 @@
 #!/usr/bin/env python3
 
 import asyncio
-import json
+import inspect
 import math
 import os
 import random
+import re
+import threading
+import time
 import uuid
+from collections import OrderedDict, deque
 from datetime import datetime
 from typing import Any, Dict, List, Optional, AsyncGenerator
 from contextlib import asynccontextmanager
+from functools import lru_cache
 
 import pyodbc
 from fastapi import FastAPI, HTTPException, Request, BackgroundTasks
-from fastapi.responses import StreamingResponse
-from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import Response, StreamingResponse
 import uvicorn
 
-# Global database connection
-db_connection = None
+from mcp_utils import json_dumpb, json_loads
 
-# Store active SSE connections
-active_connections: Dict[str, asyncio.Queue] = {}
+# Global database connection pool
+db_pool: Optional["PyodbcPool"] = None
 
-# MCP Protocol Models
-class MCPRequest(BaseModel):
-    jsonrpc: str = "2.0"
-    id: Optional[int] = None
-    method: str
-    params: Dict[str, Any] = {}
+# Schema introspection cache: key -> (expires_at, formatted result)
+SCHEMA_CACHE_SIZE = 128
+SCHEMA_CACHE_TTL = 60.0
+_schema_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
 
-class MCPResponse(BaseModel):
-    jsonrpc: str = "2.0"
-    id: Optional[int] = None
-    result: Optional[Dict[str, Any]] = None
-    error: Optional[Dict[str, Any]] = None
+_ERR_NO_DB = "❌ Database connection not available"
 
-class MCPNotification(BaseModel):
-    jsonrpc: str = "2.0"
-    method: str
-    params: Dict[str, Any] = {}
+# Whitelist of real table names (lowercase -> actual name) used before any
+# identifier is spliced into SQL; reloaded on a miss at most once per TTL
+_VALID_TABLES: Dict[str, str] = {}
+_valid_tables_loaded_at = 0.0
+_IDENTIFIER_RE = re.compile(r"^\w+$")
+
+# Store active SSE connections. With direct send enabled each connection
+# gets its own queue of pre-encoded frames; otherwise the value is None and
+# the connection only follows the shared broadcast buffer.
+active_connections: Dict[str, Optional[asyncio.Queue]] = {}
+SSE_KEEPALIVE_INTERVAL = float(os.getenv("SSE_KEEPALIVE_INTERVAL", "30"))
+SSE_DIRECT_SEND = os.getenv("SSE_DIRECT_SEND", "true").lower() in ("1", "true", "yes")
+
+# Pre-encoded SSE frame pieces
+_SSE_PREFIX = b"data: "
+_SSE_SUFFIX = b"\n\n"
+_KEEPALIVE_PREFIX = b'data: {"type":"keepalive","timestamp":"'
+_KEEPALIVE_SUFFIX = b'"}\n\n'
+
+class Broadcast:
+    """Ring buffer of pre-encoded frames shared by all SSE connections.
+    
+    Publishing is O(1) regardless of the number of connections; each reader
+    tracks the last sequence number it has seen and catches up from the
+    buffer. Readers that fall more than ``maxlen`` frames behind skip ahead.
+    """
+    
+    def __init__(self, maxlen: int = 1024):
+        self.buffer: deque = deque(maxlen=maxlen)
+        self.event = asyncio.Event()
+        self.seq = 0
+    
+    def publish(self, frame: bytes) -> int:
+        self.seq += 1
+        self.buffer.append(frame)
+        # Wake everyone currently waiting, then re-arm for the next frame
+        self.event.set()
+        self.event.clear()
+        return self.seq
+    
+    async def wait(self, last_seq: int):
+        """Wait for frames newer than last_seq; return (seq, frames)"""
+        while self.seq == last_seq:
+            await self.event.wait()
+        missed = min(self.seq - last_seq, len(self.buffer))
+        start = len(self.buffer) - missed
+        return self.seq, [self.buffer[i] for i in range(start, len(self.buffer))]
+
+broadcast = Broadcast()
+
+# MCP Protocol (JSON-RPC 2.0) envelopes are plain dicts checked by hand,
+# avoiding model construction and validation on every /mcp call
+_INVALID_REQUEST = {"code": -32600, "message": "Invalid Request"}
+
+def _mcp_response(request_id: Any, result: Optional[Dict[str, Any]] = None,
+                  error: Optional[Dict[str, Any]] = None) -> Response:
+    """Encode a JSON-RPC response envelope"""
+    return Response(
+        json_dumpb({"jsonrpc": "2.0", "id": request_id, "result": result, "error": error}),
+        media_type="application/json"
+    )
 
 # FastAPI lifespan context manager
 @asynccontextmanager
@@ -61,23 +114,26 @@ async def lifespan(app: FastAPI):
     print("   • table_sample - Get sample table data")
     print("🌐 Server running on HTTP with SSE transport...")
     
-    # Initialize database connection
+    # Initialize database connection pool
+    global db_pool
+    db_pool = PyodbcPool(build_connection_string())
     try:
-        await get_db_connection()
+        await db_pool.open()
+        print(f"✅ Database pool ready: {db_pool.size} connections")
+        await _refresh_valid_tables()
     except Exception as e:
         print(f"⚠️ Database connection failed: {e}")
         print("🚀 Server will continue with API tools only")
     
+    # One shared ticker sends keepalives to every SSE connection
+    keepalive_task = asyncio.create_task(keepalive_loop())
+    
     yield
     
     print("🛑 Shutting down FastMCP SSE Server...")
-    # Cleanup database connection
-    global db_connection
-    if db_connection:
-        try:
-            db_connection.close()
-        except:
-            pass
+    keepalive_task.cancel()
+    # Cleanup database connections
+    await db_pool.close()
     print("✅ Server shutdown complete")
 
 # Initialize FastAPI app
@@ -88,51 +144,257 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+class CORSASGIMiddleware:
+    """Pure-ASGI CORS middleware allowing any origin, method and header.
+    
+    Injects the CORS headers into ``http.response.start`` and answers
+    preflight requests directly, without wrapping requests or responses.
+    """
+    
+    ALLOW_METHODS = b"DELETE, GET, HEAD, OPTIONS, PATCH, POST, PUT"
+    MAX_AGE = b"600"
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        origin = None
+        preflight = False
+        request_headers = None
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value
+            elif name == b"access-control-request-method":
+                preflight = True
+            elif name == b"access-control-request-headers":
+                request_headers = value
+        
+        # Not a cross-origin request
+        if origin is None:
+            await self.app(scope, receive, send)
+            return
+        
+        # Credentials are allowed, so the origin is echoed rather than "*"
+        cors_headers = [
+            (b"access-control-allow-origin", origin),
+            (b"access-control-allow-credentials", b"true"),
+            (b"vary", b"Origin"),
+        ]
+        
+        if preflight and scope["method"] == "OPTIONS":
+            headers = cors_headers + [
+                (b"access-control-allow-methods", self.ALLOW_METHODS),
+                (b"access-control-max-age", self.MAX_AGE),
+            ]
+            if request_headers:
+                headers.append((b"access-control-allow-headers", request_headers))
+            await send({"type": "http.response.start", "status": 204, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        
+        async def send_with_cors(message):
+            if message["type"] == "http.response.start":
+                headers = [
+                    header for header in message.get("headers", [])
+                    if header[0].lower() != b"access-control-allow-origin"
+                ]
+                message["headers"] = headers + cors_headers
+            await send(message)
+        
+        await self.app(scope, receive, send_with_cors)
+
 # Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+app.add_middleware(CORSASGIMiddleware)
 
-async def get_db_connection():
-    """Get database connection with configuration from environment"""
-    global db_connection
-    if db_connection is None:
+def build_connection_string() -> str:
+    """Build the ODBC connection string from environment configuration"""
+    server = os.getenv("MSSQL_SERVER", "localhost")
+    database = os.getenv("MSSQL_DATABASE", "testdb")
+    username = os.getenv("MSSQL_USER", "sa")
+    password = os.getenv("MSSQL_PASSWORD", "password")
+    port = os.getenv("MSSQL_PORT", "1433")
+    
+    return (
+        f"DRIVER={{ODBC Driver 17 for SQL Server}};"
+        f"SERVER={server},{port};"
+        f"DATABASE={database};"
+        f"UID={username};"
+        f"PWD={password};"
+        f"TrustServerCertificate=yes;"
+        f"Encrypt=yes;"
+        f"Connection Timeout=30;"
+    )
+
+class PyodbcPool:
+    """Bounded pool of pyodbc connections shared by the database tools.
+    
+    Idle connections wait in an asyncio.Queue; new ones are opened on demand
+    up to ``max_size``. Connecting and pinging run in worker threads so the
+    event loop is never blocked on the network. When a connection leaves the
+    pool for good a ``None`` marker is queued, waking a waiter to open a
+    replacement in the freed slot.
+    """
+    
+    def __init__(self, connection_string: str, min_size: int = 5, max_size: int = 20):
+        self.connection_string = connection_string
+        self.min_size = min_size
+        self.max_size = max_size
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._size = 0
+    
+    @property
+    def size(self) -> int:
+        """Number of open connections, idle or checked out"""
+        return self._size
+    
+    async def _connect(self):
+        # Reserve the slot before awaiting so concurrent callers respect max_size
+        self._size += 1
         try:
-            server = os.getenv("MSSQL_SERVER", "localhost")
-            database = os.getenv("MSSQL_DATABASE", "testdb")
-            username = os.getenv("MSSQL_USER", "sa")
-            password = os.getenv("MSSQL_PASSWORD", "password")
-            port = os.getenv("MSSQL_PORT", "1433")
-            
-            connection_string = (
-                f"DRIVER={{ODBC Driver 17 for SQL Server}};"
-                f"SERVER={server},{port};"
-                f"DATABASE={database};"
-                f"UID={username};"
-                f"PWD={password};"
-                f"TrustServerCertificate=yes;"
-                f"Encrypt=yes;"
-                f"Connection Timeout=30;"
-            )
+            return await asyncio.to_thread(pyodbc.connect, self.connection_string)
+        except BaseException:
+            self._forget()
+            raise
+    
+    @staticmethod
+    def _ping(conn) -> bool:
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+            cursor.close()
+            return True
+        except pyodbc.Error:
+            return False
+    
+    def _forget(self):
+        """Give up a connection's slot and wake one waiter to reuse it"""
+        self._size -= 1
+        self._idle.put_nowait(None)
+    
+    @staticmethod
+    def _close(conn):
+        try:
+            conn.close()
+        except pyodbc.Error:
+            pass
+    
+    def _discard(self, conn):
+        self._forget()
+        self._close(conn)
+    
+    async def open(self):
+        """Open the initial ``min_size`` connections"""
+        results = await asyncio.gather(
+            *(self._connect() for _ in range(self.min_size)), return_exceptions=True
+        )
+        for result in results:
+            if not isinstance(result, BaseException):
+                self._idle.put_nowait(result)
+        if self._size == 0 and results:
+            raise results[0]
+    
+    async def _checkout(self):
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except asyncio.QueueEmpty:
+                if self._size < self.max_size:
+                    return await self._connect()
+                conn = await self._idle.get()
+            if conn is None:
+                # A slot was freed; open a connection if it is still available
+                if self._size < self.max_size:
+                    return await self._connect()
+                continue
             
-            db_connection = pyodbc.connect(connection_string)
-            print(f"✅ Database connected: {server}:{port}/{database}")
-        except Exception as e:
+            # Pre-ping so a dropped connection is replaced instead of handed out
+            try:
+                alive = await asyncio.to_thread(self._ping, conn)
+            except asyncio.CancelledError:
+                self._forget()
+                raise
+            if alive:
+                return conn
+            self._discard(conn)
+    
+    @asynccontextmanager
+    async def acquire(self):
+        """Check out a connection, yielding None if the database is unreachable"""
+        try:
+            conn = await self._checkout()
+        except pyodbc.Error as e:
             print(f"❌ Database connection failed: {str(e)}")
-            print("🚀 Continuing with API tools only")
-            db_connection = None
-    return db_connection
+            yield None
+            return
+        cancelled = False
+        try:
+            yield conn
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        finally:
+            if cancelled:
+                # A worker thread may still be running on this connection, so
+                # it must not reach the next borrower. Dropping our reference
+                # lets it close once that thread lets go of it.
+                self._forget()
+            else:
+                self._idle.put_nowait(conn)
+    
+    async def close(self):
+        """Close all idle connections"""
+        while not self._idle.empty():
+            conn = self._idle.get_nowait()
+            if conn is not None:
+                self._size -= 1
+                self._close(conn)
 
 # =============================================================================
 # API TOOLS (Priority 1 - Try these first)
 # =============================================================================
 
-async def calculator(expression: str) -> str:
-    """Calculate mathematical expressions safely."""
+# Names available to calculator expressions, built once at import
+_ALLOWED_NAMES = {
+    k: v for k, v in math.__dict__.items() 
+    if not k.startswith("__")
+}
+_ALLOWED_NAMES.update({
+    "abs": abs, "round": round, "min": min, "max": max,
+    "sum": sum, "pow": pow
+})
+
+# Remove dangerous functions
+for _dangerous in ["__import__", "eval", "exec", "open", "input"]:
+    _ALLOWED_NAMES.pop(_dangerous, None)
+
+_WEATHER_DATA = {
+    "mumbai": {"temp": 32, "condition": "Humid", "humidity": 85},
+    "delhi": {"temp": 35, "condition": "Hot", "humidity": 60},
+    "bangalore": {"temp": 25, "condition": "Pleasant", "humidity": 70},
+    "chennai": {"temp": 30, "condition": "Sunny", "humidity": 80},
+    "kolkata": {"temp": 28, "condition": "Cloudy", "humidity": 75},
+}
+
+_EXCHANGE_RATES = {
+    "USD": {"INR": 83.0, "EUR": 0.85, "GBP": 0.73},
+    "EUR": {"INR": 97.6, "USD": 1.18, "GBP": 0.86},
+    "INR": {"USD": 0.012, "EUR": 0.010, "GBP": 0.009},
+    "GBP": {"USD": 1.37, "EUR": 1.16, "INR": 113.9}
+}
+
+@lru_cache(maxsize=4096)
+def _compile(expression: str):
+    """Compile a cleaned calculator expression to a reusable code object."""
+    return compile(expression, "<calc>", "eval")
+
+@lru_cache(maxsize=2048)
+def _calc_sync(expression: str) -> str:
+    """Evaluate a calculator expression (pure, so results are memoized)."""
     try:
         # Clean the expression
         expression = expression.strip()
@@ -142,42 +404,49 @@ async def calculator(expression: str) -> str:
         # Remove question marks and other non-math characters
         expression = expression.replace('?', '').replace('=', '').strip()
         
-        allowed_names = {
-            k: v for k, v in math.__dict__.items() 
-            if not k.startswith("__")
-        }
-        allowed_names.update({
-            "abs": abs, "round": round, "min": min, "max": max,
-            "sum": sum, "pow": pow
-        })
-        
-        # Remove dangerous functions
-        for dangerous in ["__import__", "eval", "exec", "open", "input"]:
-            allowed_names.pop(dangerous, None)
-        
-        result = eval(expression, {"__builtins__": {}}, allowed_names)
+        result = eval(_compile(expression), {"__builtins__": {}}, _ALLOWED_NAMES)
         return f"Result: {result}"
-    except Exception as e:
+    except (SyntaxError, NameError, AttributeError, TypeError, ValueError, ArithmeticError) as e:
+        return f"Error calculating '{expression}': {str(e)}"
+
+@lru_cache(maxsize=64)
+def _weather_known(city_lower: str) -> Optional[str]:
+    """Format the static report for a known city, or None if unknown."""
+    data = _WEATHER_DATA.get(city_lower)
+    if data is None:
+        return None
+    return (f"Weather in {city_lower.title()}:\n"
+           f"Temperature: {data['temp']}°C\n"
+           f"Condition: {data['condition']}\n"
+           f"Humidity: {data['humidity']}%")
+
+@lru_cache(maxsize=256, typed=True)
+def _convert_sync(amount: float, from_curr: str, to_curr: str) -> str:
+    """Convert between currencies using the static rate table."""
+    if from_curr == to_curr:
+        return f"{amount} {from_curr} = {amount} {to_curr}"
+    
+    if from_curr in _EXCHANGE_RATES and to_curr in _EXCHANGE_RATES[from_curr]:
+        rate = _EXCHANGE_RATES[from_curr][to_curr]
+        converted = amount * rate
+        return (f"{amount} {from_curr} = {converted:.2f} {to_curr}\n"
+               f"Exchange rate: 1 {from_curr} = {rate} {to_curr}")
+    else:
+        return f"Exchange rate not available for {from_curr} to {to_curr}"
+
+async def calculator(expression: str) -> str:
+    """Calculate mathematical expressions safely."""
+    try:
+        return _calc_sync(expression)
+    except (AttributeError, TypeError) as e:
         return f"Error calculating '{expression}': {str(e)}"
 
 async def weather_info(city: str) -> str:
     """Get current weather information for a city."""
     try:
-        weather_data = {
-            "mumbai": {"temp": 32, "condition": "Humid", "humidity": 85},
-            "delhi": {"temp": 35, "condition": "Hot", "humidity": 60},
-            "bangalore": {"temp": 25, "condition": "Pleasant", "humidity": 70},
-            "chennai": {"temp": 30, "condition": "Sunny", "humidity": 80},
-            "kolkata": {"temp": 28, "condition": "Cloudy", "humidity": 75},
-        }
-        
-        city_lower = city.lower()
-        if city_lower in weather_data:
-            data = weather_data[city_lower]
-            return (f"Weather in {city.title()}:\n"
-                   f"Temperature: {data['temp']}°C\n"
-                   f"Condition: {data['condition']}\n"
-                   f"Humidity: {data['humidity']}%")
+        known = _weather_known(city.lower())
+        if known is not None:
+            return known
         else:
             temp = random.randint(15, 40)
             conditions = ["Sunny", "Cloudy", "Rainy", "Partly Cloudy"]
@@ -186,116 +455,245 @@ async def weather_info(city: str) -> str:
                    f"Temperature: {temp}°C\n"
                    f"Condition: {random.choice(conditions)}\n"
                    f"Humidity: {humidity}%")
-    except Exception as e:
+    except AttributeError as e:
         return f"Error fetching weather for {city}: {str(e)}"
 
 async def currency_converter(amount: float, from_currency: str, to_currency: str) -> str:
     """Convert currency from one type to another."""
     try:
-        exchange_rates = {
-            "USD": {"INR": 83.0, "EUR": 0.85, "GBP": 0.73},
-            "EUR": {"INR": 97.6, "USD": 1.18, "GBP": 0.86},
-            "INR": {"USD": 0.012, "EUR": 0.010, "GBP": 0.009},
-            "GBP": {"USD": 1.37, "EUR": 1.16, "INR": 113.9}
-        }
-        
-        from_curr = from_currency.upper()
-        to_curr = to_currency.upper()
-        
-        if from_curr == to_curr:
-            return f"{amount} {from_curr} = {amount} {to_curr}"
-        
-        if from_curr in exchange_rates and to_curr in exchange_rates[from_curr]:
-            rate = exchange_rates[from_curr][to_curr]
-            converted = amount * rate
-            return (f"{amount} {from_curr} = {converted:.2f} {to_curr}\n"
-                   f"Exchange rate: 1 {from_curr} = {rate} {to_curr}")
-        else:
-            return f"Exchange rate not available for {from_curr} to {to_curr}"
-    except Exception as e:
+        return _convert_sync(amount, from_currency.upper(), to_currency.upper())
+    except (AttributeError, TypeError) as e:
         return f"Error converting currency: {str(e)}"
 
+# Last time_info result as (epoch second, timezone, text)
+_time_info_last = (None, None, "")
+
 async def time_info(timezone: str = "UTC") -> str:
     """Get current time information."""
+    global _time_info_last
     try:
-        current_time = datetime.now()
-        return (f"Current Time Information:\n"
+        # Reuse the formatted text for repeated calls within the same second
+        now = time.time()
+        second = int(now)
+        if _time_info_last[0] == second and _time_info_last[1] == timezone:
+            return _time_info_last[2]
+        
+        current_time = datetime.fromtimestamp(now)
+        text = (f"Current Time Information:\n"
                f"DateTime: {current_time.strftime('%Y-%m-%d %H:%M:%S')}\n"
                f"Day: {current_time.strftime('%A')}\n"
                f"Timezone: {timezone}\n"
                f"Timestamp: {current_time.timestamp()}")
-    except Exception as e:
+        _time_info_last = (second, timezone, text)
+        return text
+    except (ValueError, OSError) as e:
         return f"Error getting time info: {str(e)}"
 
+# A non-blank sentence: its first non-space character up to the next period
+_SENTENCE_RE = re.compile(r"[^.\s][^.]*")
+
 async def text_analyzer(text: str) -> str:
     """Analyze text and provide statistics."""
     try:
-        words = text.split()
-        sentences = text.split('.')
-        paragraphs = text.split('\n\n')
+        word_count = len(text.split())
+        # Count in C-level scans without building stripped copies of each piece
+        sentence_count = sum(1 for _ in _SENTENCE_RE.finditer(text))
+        sentence_slots = text.count('.') + 1
+        paragraph_count = sum(1 for p in text.split('\n\n') if p and not p.isspace())
         
         return (f"Text Analysis:\n"
                f"Characters: {len(text)}\n"
-               f"Words: {len(words)}\n"
-               f"Sentences: {len([s for s in sentences if s.strip()])}\n"
-               f"Paragraphs: {len([p for p in paragraphs if p.strip()])}\n"
-               f"Average words per sentence: {len(words) / max(len(sentences), 1):.1f}")
-    except Exception as e:
+               f"Words: {word_count}\n"
+               f"Sentences: {sentence_count}\n"
+               f"Paragraphs: {paragraph_count}\n"
+               f"Average words per sentence: {word_count / sentence_slots:.1f}")
+    except (AttributeError, TypeError) as e:
         return f"Error analyzing text: {str(e)}"
 
 # =============================================================================
 # DATABASE TOOLS (Priority 2 - Fallback when API tools don't match)
 # =============================================================================
 
+def _exec_fetchall(conn, sql: str, params=()):
+    """Run a query on a pooled connection and return (columns, rows).
+    
+    Blocking; call through asyncio.to_thread so the event loop stays free.
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute(sql, params)
+        columns = [description[0] for description in cursor.description] if cursor.description else []
+        rows = cursor.fetchall()
+        return columns, rows
+    finally:
+        cursor.close()
+
+FETCH_BATCH_SIZE = 500
+_END_OF_ROWS = object()
+
+@asynccontextmanager
+async def _select_batches(conn, sql: str, params=(), batch_size: int = FETCH_BATCH_SIZE):
+    """Run a SELECT in a worker thread, fetching rows with fetchmany.
+    
+    Yields (columns, batches) where batches is an async iterator of row lists.
+    The queue between the thread and the event loop is bounded, so the worker
+    stays at most a few batches ahead of the consumer. On exit the worker is
+    stopped and joined before the connection can go back to the pool.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=4)
+    stop = threading.Event()
+    finished = False
+    
+    def put(item):
+        asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+    
+    def worker():
+        cursor = conn.cursor()
+        try:
+            cursor.execute(sql, params)
+            put([description[0] for description in cursor.description] if cursor.description else [])
+            while not stop.is_set():
+                batch = cursor.fetchmany(batch_size)
+                if not batch:
+                    break
+                put(batch)
+        except Exception as e:
+            put(e)
+        finally:
+            cursor.close()
+            put(_END_OF_ROWS)
+    
+    async def next_item():
+        nonlocal finished
+        item = await queue.get()
+        if item is _END_OF_ROWS:
+            finished = True
+        elif isinstance(item, Exception):
+            raise item
+        return item
+    
+    async def batches():
+        while True:
+            item = await next_item()
+            if item is _END_OF_ROWS:
+                return
+            yield item
+    
+    worker_task = asyncio.ensure_future(asyncio.to_thread(worker))
+    try:
+        columns = await next_item()
+        yield columns, batches()
+    finally:
+        # Stop the worker and drain whatever it still has in flight
+        stop.set()
+        while not finished:
+            if await queue.get() is _END_OF_ROWS:
+                finished = True
+        await worker_task
+
+def _exec_commit(conn, sql: str, params=()):
+    """Run a non-SELECT statement and commit it (blocking)."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(sql, params)
+        conn.commit()
+    finally:
+        cursor.close()
+
+def _schema_cache_get(key: tuple) -> Optional[str]:
+    """Return a cached schema result if it has not expired"""
+    entry = _schema_cache.get(key)
+    if entry is None:
+        return None
+    if entry[0] <= time.monotonic():
+        del _schema_cache[key]
+        return None
+    _schema_cache.move_to_end(key)
+    return entry[1]
+
+def _schema_cache_put(key: tuple, result: str):
+    """Store a schema result, evicting the least recently used entry when full"""
+    _schema_cache[key] = (time.monotonic() + SCHEMA_CACHE_TTL, result)
+    _schema_cache.move_to_end(key)
+    if len(_schema_cache) > SCHEMA_CACHE_SIZE:
+        _schema_cache.popitem(last=False)
+
+_LIST_TABLES_SQL = """
+    SELECT TABLE_NAME 
+    FROM INFORMATION_SCHEMA.TABLES 
+    WHERE TABLE_TYPE = 'BASE TABLE'
+    ORDER BY TABLE_NAME
+"""
+
+def _set_valid_tables(tables: List[str]):
+    global _valid_tables_loaded_at
+    _VALID_TABLES.clear()
+    _VALID_TABLES.update((table.lower(), table) for table in tables)
+    _valid_tables_loaded_at = time.monotonic()
+
+async def _refresh_valid_tables():
+    """Reload the table whitelist; raise ConnectionError if the DB is unreachable"""
+    async with db_pool.acquire() as conn:
+        if not conn:
+            raise ConnectionError("Database connection not available")
+        _, rows = await asyncio.to_thread(_exec_fetchall, conn, _LIST_TABLES_SQL)
+    _set_valid_tables([row[0] for row in rows])
+
+async def _resolve_table(table_name: str) -> Optional[str]:
+    """Map a user-supplied table name to a real table, or None if unknown"""
+    actual = _VALID_TABLES.get(table_name.lower())
+    if actual is None and time.monotonic() - _valid_tables_loaded_at > SCHEMA_CACHE_TTL:
+        await _refresh_valid_tables()
+        actual = _VALID_TABLES.get(table_name.lower())
+    return actual
+
 async def list_tables() -> str:
     """List all tables in the database."""
+    cached = _schema_cache_get(("list_tables",))
+    if cached is not None:
+        return cached
     try:
-        conn = await get_db_connection()
-        if not conn:
-            return "❌ Database connection not available"
-        
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT TABLE_NAME 
-            FROM INFORMATION_SCHEMA.TABLES 
-            WHERE TABLE_TYPE = 'BASE TABLE'
-            ORDER BY TABLE_NAME
-        """)
+        async with db_pool.acquire() as conn:
+            if not conn:
+                return _ERR_NO_DB
+            
+            _, rows = await asyncio.to_thread(_exec_fetchall, conn, _LIST_TABLES_SQL)
         
-        tables = [row[0] for row in cursor.fetchall()]
-        cursor.close()
+        tables = [row[0] for row in rows]
+        _set_valid_tables(tables)
         
         if tables:
-            return "Available Tables:\n" + "\n".join(f"• {table}" for table in tables)
+            result = "Available Tables:\n" + "\n".join(f"• {table}" for table in tables)
         else:
-            return "No tables found in the database."
-    except Exception as e:
+            result = "No tables found in the database."
+        _schema_cache_put(("list_tables",), result)
+        return result
+    except pyodbc.Error as e:
         return f"Error listing tables: {str(e)}"
 
 async def describe_table(table_name: str) -> str:
     """Describe the structure of a database table."""
+    key = ("describe_table", table_name)
+    cached = _schema_cache_get(key)
+    if cached is not None:
+        return cached
     try:
-        conn = await get_db_connection()
-        if not conn:
-            return "❌ Database connection not available"
-        
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT 
-                COLUMN_NAME,
-                DATA_TYPE,
-                IS_NULLABLE,
-                COLUMN_DEFAULT,
-                CHARACTER_MAXIMUM_LENGTH
-            FROM INFORMATION_SCHEMA.COLUMNS 
-            WHERE TABLE_NAME = ?
-            ORDER BY ORDINAL_POSITION
-        """, (table_name,))
-        
-        columns = cursor.fetchall()
-        cursor.close()
+        async with db_pool.acquire() as conn:
+            if not conn:
+                return _ERR_NO_DB
+            
+            _, columns = await asyncio.to_thread(_exec_fetchall, conn, """
+                SELECT 
+                    COLUMN_NAME,
+                    DATA_TYPE,
+                    IS_NULLABLE,
+                    COLUMN_DEFAULT,
+                    CHARACTER_MAXIMUM_LENGTH
+                FROM INFORMATION_SCHEMA.COLUMNS 
+                WHERE TABLE_NAME = ?
+                ORDER BY ORDINAL_POSITION
+            """, (table_name,))
         
         if not columns:
             return f"Table '{table_name}' not found."
@@ -309,85 +707,119 @@ async def describe_table(table_name: str) -> str:
             
             result += f"{col_name:<20} {data_type}{length_info:<15} {nullable_info:<10} {default_info}\n"
         
+        _schema_cache_put(key, result)
         return result
-    except Exception as e:
+    except pyodbc.Error as e:
         return f"Error describing table '{table_name}': {str(e)}"
 
+# TOP has to follow an optional DISTINCT/ALL, so capture that with SELECT
+_SELECT_RE = re.compile(r"^\s*SELECT(?:\s+(?:DISTINCT|ALL))?\b", re.IGNORECASE)
+_HAS_TOP_OR_LIMIT = re.compile(r"\b(?:TOP|LIMIT)\b", re.IGNORECASE)
+
+def _apply_limit(query: str, limit: int):
+    """Add a TOP clause to unbounded SELECTs; return (query, is_select)"""
+    match = _SELECT_RE.match(query)
+    if match and not _HAS_TOP_OR_LIMIT.search(query):
+        query = f"{match.group()} TOP ({int(limit)}){query[match.end():]}"
+    return query, match is not None
+
+def _format_header(columns) -> str:
+    return ("Query Results:\n" + "="*50 + "\n"
+            + " | ".join(f"{col:<15}" for col in columns) + "\n"
+            + "-"*50 + "\n")
+
+def _format_row(row) -> str:
+    return " | ".join(f"{str(val):<15}" for val in row) + "\n"
+
+def _format_footer(row_count: int, limit: int) -> str:
+    footer = f"\nTotal rows: {row_count}"
+    if row_count == limit:
+        footer += f" (Limited to {limit} rows)"
+    return footer
+
 async def execute_query(query: str, limit: int = 100) -> str:
     """Execute a SQL query and return results."""
     try:
-        conn = await get_db_connection()
-        if not conn:
-            return "❌ Database connection not available"
-        
-        cursor = conn.cursor()
-        
-        query_upper = query.upper().strip()
-        if query_upper.startswith('SELECT') and 'LIMIT' not in query_upper and 'TOP' not in query_upper:
-            query = query.replace('SELECT', f'SELECT TOP {limit}', 1)
+        query, is_select = _apply_limit(query, limit)
         
-        cursor.execute(query)
-        
-        if query_upper.startswith('SELECT'):
-            columns = [description[0] for description in cursor.description]
-            rows = cursor.fetchall()
-            
-            if not rows:
-                return "Query executed successfully. No results returned."
+        async with db_pool.acquire() as conn:
+            if not conn:
+                return _ERR_NO_DB
             
-            result = "Query Results:\n" + "="*50 + "\n"
-            result += " | ".join(f"{col:<15}" for col in columns) + "\n"
-            result += "-"*50 + "\n"
+            if not is_select:
+                await asyncio.to_thread(_exec_commit, conn, query)
+                return "Query executed successfully."
             
-            for row in rows:
-                result += " | ".join(f"{str(val):<15}" for val in row) + "\n"
-            
-            result += f"\nTotal rows: {len(rows)}"
-            if len(rows) == limit:
-                result += f" (Limited to {limit} rows)"
-            
-            return result
-        else:
-            conn.commit()
-            return "Query executed successfully."
+            # Collect parts and join once instead of growing one string per row
+            row_count = 0
+            async with _select_batches(conn, query) as (columns, batches):
+                parts = [_format_header(columns)]
+                async for batch in batches:
+                    row_count += len(batch)
+                    parts.extend(map(_format_row, batch))
+        
+        if not row_count:
+            return "Query executed successfully. No results returned."
+        
+        parts.append(_format_footer(row_count, limit))
+        return "".join(parts)
     
-    except Exception as e:
+    except pyodbc.Error as e:
         return f"Error executing query: {str(e)}"
-    finally:
-        if 'cursor' in locals():
-            cursor.close()
 
-async def count_records(table_name: str, where_clause: str = "") -> str:
-    """Count records in a table with optional WHERE clause."""
+async def count_records(table_name: str, filters: Optional[Dict[str, Any]] = None) -> str:
+    """Count records in a table, optionally matching column = value filters."""
     try:
-        conn = await get_db_connection()
-        if not conn:
-            return "❌ Database connection not available"
+        actual = await _resolve_table(table_name)
+        if actual is None:
+            return f"Table '{table_name}' not found."
         
-        query = f"SELECT COUNT(*) FROM {table_name}"
-        if where_clause:
-            query += f" WHERE {where_clause}"
+        # Identifiers come from the whitelist or are checked; values are bound
+        query = f"SELECT COUNT(*) FROM [{actual}]"
+        conditions = []
+        params = []
+        for column, value in (filters or {}).items():
+            if not _IDENTIFIER_RE.match(column):
+                return f"Invalid column name '{column}'"
+            if value is None:
+                conditions.append(f"[{column}] IS NULL")
+            else:
+                conditions.append(f"[{column}] = ?")
+                params.append(value)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
         
-        cursor = conn.cursor()
-        cursor.execute(query)
-        count = cursor.fetchone()[0]
-        cursor.close()
+        async with db_pool.acquire() as conn:
+            if not conn:
+                return _ERR_NO_DB
+            
+            _, rows = await asyncio.to_thread(_exec_fetchall, conn, query, params)
         
-        where_info = f" (WHERE {where_clause})" if where_clause else ""
-        return f"Table '{table_name}'{where_info}: {count:,} records"
-    except Exception as e:
+        count = rows[0][0]
+        
+        where_info = ""
+        if filters:
+            where_info = " (WHERE " + " AND ".join(f"{column} = {value!r}" for column, value in filters.items()) + ")"
+        return f"Table '{actual}'{where_info}: {count:,} records"
+    except ConnectionError:
+        return _ERR_NO_DB
+    except pyodbc.Error as e:
         return f"Error counting records in '{table_name}': {str(e)}"
 
 async def table_sample(table_name: str, sample_size: int = 5) -> str:
     """Get a sample of records from a table."""
     try:
-        conn = await get_db_connection()
-        if not conn:
-            return "❌ Database connection not available"
+        actual = await _resolve_table(table_name)
+        if actual is None:
+            return f"Table '{table_name}' not found."
         
-        query = f"SELECT TOP {sample_size} * FROM {table_name}"
+        # execute_query checks out its own connection
+        sample_size = int(sample_size)
+        query = f"SELECT TOP {sample_size} * FROM [{actual}]"
         return await execute_query(query, sample_size)
-    except Exception as e:
+    except ConnectionError:
+        return _ERR_NO_DB
+    except (pyodbc.Error, ValueError, TypeError) as e:
         return f"Error sampling table '{table_name}': {str(e)}"
 
 # =============================================================================
@@ -500,7 +932,11 @@ TOOLS = {
             "type": "object",
             "properties": {
                 "table_name": {"type": "string", "description": "Name of the table"},
-                "where_clause": {"type": "string", "description": "Optional WHERE clause"}
+                "filters": {
+                    "type": "object",
+                    "description": "Optional column/value pairs that must all match",
+                    "additionalProperties": True
+                }
             },
             "required": ["table_name"]
         },
@@ -521,6 +957,22 @@ TOOLS = {
     }
 }
 
+# Resolve sync vs async handlers once instead of on every call
+for _tool_info in TOOLS.values():
+    _tool_info["is_async"] = inspect.iscoroutinefunction(_tool_info["handler"])
+
+# The registry is static, so the tools/list payload is built once
+_TOOLS_LIST_RESPONSE = {
+    "tools": [
+        {
+            "name": tool_info["name"],
+            "description": tool_info["description"],
+            "inputSchema": tool_info["inputSchema"]
+        }
+        for tool_info in TOOLS.values()
+    ]
+}
+
 # =============================================================================
 # MCP PROTOCOL HANDLERS
 # =============================================================================
@@ -541,15 +993,7 @@ async def handle_initialize(params: Dict[str, Any]) -> Dict[str, Any]:
 
 async def handle_tools_list() -> Dict[str, Any]:
     """Handle tools/list request"""
-    tools = []
-    for tool_name, tool_info in TOOLS.items():
-        tools.append({
-            "name": tool_info["name"],
-            "description": tool_info["description"],
-            "inputSchema": tool_info["inputSchema"]
-        })
-    
-    return {"tools": tools}
+    return _TOOLS_LIST_RESPONSE
 
 async def handle_tools_call(name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
     """Handle tools/call request"""
@@ -567,11 +1011,11 @@ async def handle_tools_call(name: str, arguments: Dict[str, Any]) -> Dict[str, A
     handler = tool["handler"]
     
     try:
-        # Call the tool handler
-        if asyncio.iscoroutinefunction(handler):
+        # Call the tool handler; sync handlers run in a worker thread
+        if tool["is_async"]:
             result = await handler(**arguments)
         else:
-            result = handler(**arguments)
+            result = await asyncio.to_thread(handler, **arguments)
         
         return {
             "content": [
@@ -591,6 +1035,19 @@ async def handle_tools_call(name: str, arguments: Dict[str, Any]) -> Dict[str, A
             ]
         }
 
+async def _list_adapter(params: Dict[str, Any]) -> Dict[str, Any]:
+    return await handle_tools_list()
+
+async def _call_adapter(params: Dict[str, Any]) -> Dict[str, Any]:
+    return await handle_tools_call(params.get("name"), params.get("arguments", {}))
+
+# MCP method name -> handler taking the request params
+_METHODS = {
+    "initialize": handle_initialize,
+    "tools/list": _list_adapter,
+    "tools/call": _call_adapter,
+}
+
 # =============================================================================
 # HTTP ENDPOINTS
 # =============================================================================
@@ -605,7 +1062,10 @@ async def root():
         "endpoints": {
             "mcp": "/mcp",
             "events": "/events/{connection_id}",
-            "tools": "/tools"
+            "broadcast": "/events/broadcast",
+            "mcp_stream": "/mcp/stream",
+            "tools": "/tools",
+            "cache_invalidate": "/cache/invalidate"
         }
     }
 
@@ -615,7 +1075,7 @@ async def health_check():
     return {
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
-        "database": "connected" if db_connection else "disconnected",
+        "database": "connected" if db_pool and db_pool.size else "disconnected",
         "tools": len(TOOLS)
     }
 
@@ -624,61 +1084,155 @@ async def get_tools():
     """Get available tools"""
     return await handle_tools_list()
 
+@app.post("/cache/invalidate")
+async def invalidate_cache():
+    """Drop cached schema lookups (call after DDL changes)"""
+    global _valid_tables_loaded_at
+    cleared = len(_schema_cache)
+    _schema_cache.clear()
+    # Force the table whitelist to reload on its next miss
+    _valid_tables_loaded_at = 0.0
+    return {"status": "invalidated", "cleared": cleared}
+
+@app.post("/mcp/stream")
+async def stream_query(body: Dict[str, Any]):
+    """Stream SELECT results as SSE frames: header, one frame per row batch, footer"""
+    limit = int(body.get("limit", 100))
+    query, is_select = _apply_limit(body.get("query", ""), limit)
+    if not is_select:
+        raise HTTPException(status_code=400, detail="Only SELECT queries can be streamed")
+    
+    async def row_generator() -> AsyncGenerator[bytes, None]:
+        async with db_pool.acquire() as conn:
+            if not conn:
+                yield _sse_frame({'type': 'error', 'message': _ERR_NO_DB})
+                return
+            
+            # Rows are sent batch by batch as the worker fetches them
+            row_count = 0
+            try:
+                async with _select_batches(conn, query) as (columns, batches):
+                    async for batch in batches:
+                        if not row_count:
+                            yield _sse_frame({'type': 'header', 'text': _format_header(columns)})
+                        row_count += len(batch)
+                        yield _sse_frame({'type': 'rows', 'text': "".join(map(_format_row, batch))})
+            except pyodbc.Error as e:
+                yield _sse_frame({'type': 'error', 'message': f"Error executing query: {str(e)}"})
+                return
+        
+        if not row_count:
+            text = "Query executed successfully. No results returned."
+        else:
+            text = _format_footer(row_count, limit)
+        yield _sse_frame({'type': 'footer', 'text': text, 'rowCount': row_count})
+    
+    return StreamingResponse(
+        row_generator(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"}
+    )
+
 @app.post("/mcp")
-async def handle_mcp_request(request: MCPRequest):
+async def handle_mcp_request(request: Request):
     """Handle MCP protocol requests"""
     try:
-        if request.method == "initialize":
-            result = await handle_initialize(request.params)
-            return MCPResponse(id=request.id, result=result)
-        
-        elif request.method == "tools/list":
-            result = await handle_tools_list()
-            return MCPResponse(id=request.id, result=result)
-        
-        elif request.method == "tools/call":
-            name = request.params.get("name")
-            arguments = request.params.get("arguments", {})
-            result = await handle_tools_call(name, arguments)
-            return MCPResponse(id=request.id, result=result)
-        
-        else:
-            return MCPResponse(
-                id=request.id,
-                error={"code": -32601, "message": f"Method '{request.method}' not found"}
-            )
+        message = json_loads(await request.body())
+    except ValueError as e:
+        return _mcp_response(None, error={"code": -32700, "message": f"Parse error: {str(e)}"})
     
+    if not isinstance(message, dict):
+        return _mcp_response(None, error=_INVALID_REQUEST)
+    
+    request_id = message.get("id")
+    if not isinstance(request_id, (int, str, type(None))):
+        return _mcp_response(None, error=_INVALID_REQUEST)
+    
+    method = message.get("method")
+    params = message.get("params")
+    if params is None:
+        params = {}
+    if not isinstance(method, str) or not isinstance(params, dict):
+        return _mcp_response(request_id, error=_INVALID_REQUEST)
+    
+    handler = _METHODS.get(method)
+    if handler is None:
+        return _mcp_response(
+            request_id,
+            error={"code": -32601, "message": f"Method '{method}' not found"}
+        )
+    
+    try:
+        return _mcp_response(request_id, result=await handler(params))
     except Exception as e:
-        return MCPResponse(
-            id=request.id,
+        return _mcp_response(
+            request_id,
             error={"code": -32603, "message": f"Internal error: {str(e)}"}
         )
 
+def _sse_frame(payload: Any) -> bytes:
+    """Encode a payload as a single SSE data frame"""
+    return _SSE_PREFIX + json_dumpb(payload) + _SSE_SUFFIX
+
+def _keepalive_frame() -> bytes:
+    """Build a keepalive frame; only the timestamp varies"""
+    return _KEEPALIVE_PREFIX + datetime.now().isoformat().encode() + _KEEPALIVE_SUFFIX
+
+async def keepalive_loop():
+    """Periodically publish one keepalive frame to all SSE connections"""
+    while True:
+        await asyncio.sleep(SSE_KEEPALIVE_INTERVAL)
+        broadcast.publish(_keepalive_frame())
+
 @app.get("/events/{connection_id}")
 async def sse_endpoint(connection_id: str):
     """Server-Sent Events endpoint"""
     
-    async def event_generator() -> AsyncGenerator[str, None]:
-        # Create a queue for this connection
-        queue = asyncio.Queue()
+    async def event_generator() -> AsyncGenerator[bytes, None]:
+        # Create a queue for this connection when direct send is enabled
+        queue = asyncio.Queue() if SSE_DIRECT_SEND else None
         active_connections[connection_id] = queue
+        last_seq = broadcast.seq
+        direct_task = None
+        broadcast_task = None
         
         try:
-            yield f"data: {json.dumps({'type': 'connected', 'connectionId': connection_id})}\n\n"
+            yield _sse_frame({'type': 'connected', 'connectionId': connection_id})
             
+            # Frames arrive already encoded from either source
             while True:
-                try:
-                    # Wait for messages with timeout
-                    message = await asyncio.wait_for(queue.get(), timeout=30.0)
-                    yield f"data: {json.dumps(message)}\n\n"
-                except asyncio.TimeoutError:
-                    # Send keepalive
-                    yield f"data: {json.dumps({'type': 'keepalive', 'timestamp': datetime.now().isoformat()})}\n\n"
+                if queue is None:
+                    last_seq, frames = await broadcast.wait(last_seq)
+                    for frame in frames:
+                        yield frame
+                    continue
+                
+                # Keep one pending waiter per source instead of recreating both
+                if direct_task is None:
+                    direct_task = asyncio.ensure_future(queue.get())
+                if broadcast_task is None:
+                    broadcast_task = asyncio.ensure_future(broadcast.wait(last_seq))
+                
+                done, _ = await asyncio.wait(
+                    (direct_task, broadcast_task), return_when=asyncio.FIRST_COMPLETED
+                )
+                if direct_task in done:
+                    frame = direct_task.result()
+                    direct_task = None
+                    yield frame
+                if broadcast_task in done:
+                    last_seq, frames = broadcast_task.result()
+                    broadcast_task = None
+                    for frame in frames:
+                        yield frame
                 
         except asyncio.CancelledError:
             pass
         finally:
             # Clean up connection
+            for task in (direct_task, broadcast_task):
+                if task is not None:
+                    task.cancel()
             active_connections.pop(connection_id, None)
     
     return StreamingResponse(
@@ -695,12 +1249,20 @@ async def sse_endpoint(connection_id: str):
 @app.post("/events/{connection_id}/send")
 async def send_event(connection_id: str, event: Dict[str, Any]):
     """Send event to specific SSE connection"""
+    if not SSE_DIRECT_SEND:
+        raise HTTPException(status_code=409, detail="Direct send is disabled; use /events/broadcast")
     if connection_id in active_connections:
-        await active_connections[connection_id].put(event)
+        active_connections[connection_id].put_nowait(_sse_frame(event))
         return {"status": "sent"}
     else:
         raise HTTPException(status_code=404, detail="Connection not found")
 
+@app.post("/events/broadcast")
+async def broadcast_event(event: Dict[str, Any]):
+    """Send event to all SSE connections"""
+    seq = broadcast.publish(_sse_frame(event))
+    return {"status": "broadcast", "seq": seq, "connections": len(active_connections)}
+
 @app.get("/connections")
 async def get_connections():
     """Get active SSE connections"""
@@ -717,12 +1279,22 @@ if __name__ == "__main__":
     port = int(os.getenv("PORT", 8000))
     host = os.getenv("HOST", "0.0.0.0")
     
-    print(f"🚀 Starting FastMCP SSE Server on {host}:{port}")
+    # SSE connections and the broadcast buffer live in process memory, so a
+    # client's /events stream and its /send calls must hit the same worker.
+    # Keep the default of one worker unless routing is sticky.
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    
+    print(f"🚀 Starting FastMCP SSE Server on {host}:{port} ({workers} worker(s))")
     
+    # loop/http "auto" pick uvloop and httptools when installed
+    # (pip install "uvicorn[standard]") and fall back to asyncio/h11 otherwise.
     uvicorn.run(
-        app,
+        "server2:app" if workers > 1 else app,
         host=host,
         port=port,
+        loop="auto",
+        http="auto",
+        workers=workers,
         log_level="info",
-        access_log=True
+        access_log=False
     )
\ No newline at end of file
@@ -1,22 +1,204 @@
+import asyncio
 import os
+import re
 import sys
 import json
-import subprocess
-import threading
-import time
+import logging
 import signal
+import heapq
+import hashlib
+import tempfile
+from collections import deque
+from contextlib import asynccontextmanager
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any
+
+from mcp_utils import LazyJSON, ainput, json_dumpb, json_loads, json_pretty
+
+logger = logging.getLogger("sql-mcp-agent")
+
+# stdout is read in fixed-size chunks and split into NDJSON lines locally;
+# stderr still uses readline, so allow long lines instead of asyncio's
+# 64 KiB default
+MCP_READ_CHUNK = 64 * 1024
+MCP_STREAM_LIMIT = 16 * 1024 * 1024
+
+# Protocol frames that never change; only the request id is spliced in
+_INIT_PARAMS = {
+    "protocolVersion": "2024-11-05",
+    "capabilities": {
+        "roots": {"listChanged": True},
+        "sampling": {}
+    },
+    "clientInfo": {
+        "name": "Custom SQL MCP Agent",
+        "version": "1.0.0"
+    }
+}
+_INIT_FRAME_HEAD = b'{"jsonrpc":"2.0","id":'
+_INIT_FRAME_TAIL = (b',"method":"initialize","params":'
+                    + json.dumps(_INIT_PARAMS, separators=(',', ':')).encode('utf-8') + b'}\n')
+_INITIALIZED_FRAME = b'{"jsonrpc":"2.0","method":"notifications/initialized","params":{}}\n'
+
+# How long to wait for the server to report it is up before talking to it anyway
+MCP_READY_TIMEOUT = float(os.getenv('MCP_READY_TIMEOUT', '10'))
+_READY_RE = re.compile(rb'\b(?:running|listening|ready)\b', re.IGNORECASE)
+# stderr lines that point at a bad server configuration
+_CONFIG_ERROR_RE = re.compile(rb'config\.server|configuration')
+
+# In-flight requests live in a fixed slot array. A request id is
+# (generation << _SLOT_BITS) | slot, so the slot is found by masking and a
+# late reply for a slot that has since been reused is ignored.
+_SLOT_BITS = 10
+MAX_IN_FLIGHT = 1 << _SLOT_BITS
+_SLOT_MASK = MAX_IN_FLIGHT - 1
+MCP_REQUEST_TIMEOUT = 15.0
+
+class _Pending:
+    __slots__ = ('request_id', 'future')
+
+    def __init__(self, request_id: int, future: asyncio.Future):
+        self.request_id = request_id
+        self.future = future
+
+def _encode_frame(message: Dict[str, Any]) -> bytes:
+    """Serialize a JSON-RPC message as one newline-terminated line"""
+    return json_dumpb(message) + b'\n'
+
+_RULE = '─' * 50
+
+# Natural-language analysis patterns. Keywords match at the start of a word,
+# so plurals and other suffixes ("customers", "orders") still hit.
+_INTENT_KEYWORDS = {
+    'SELECT': ['show', 'list', 'get', 'find', 'select', 'display'],
+    'COUNT': ['count', 'how many', 'total'],
+    'INSERT': ['create', 'add', 'insert'],
+    'UPDATE': ['update', 'change', 'modify'],
+    'DELETE': ['delete', 'remove', 'drop'],
+    'DESCRIBE': ['describe', 'structure', 'schema', 'columns'],
+}
+_INTENT_PRIORITY = list(_INTENT_KEYWORDS)
+_TABLE_KEYWORDS = {
+    'customers': ['customer', 'client', 'user'],
+    'orders': ['order', 'purchase', 'sale'],
+    'products': ['product', 'item'],
+    'employees': ['employee', 'staff', 'worker'],
+    'payments': ['payment', 'invoice', 'billing'],
+    'support_tickets': ['ticket', 'issue', 'support']
+}
+
+def _keyword_groups(groups: Dict[str, List[str]]) -> 're.Pattern':
+    return re.compile('|'.join(
+        rf"\b(?P<{name}>{'|'.join(map(re.escape, words))})" for name, words in groups.items()
+    ))
+
+_INTENT_RE = _keyword_groups(_INTENT_KEYWORDS)
+_TABLE_RE = _keyword_groups(_TABLE_KEYWORDS)
+# One pass picks up every condition; the first occurrence of each kind wins
+_CONDITION_RE = re.compile(
+    r'\b(?:'
+    r'(?:from|in)\s+(?P<location>\w+)'
+    r'|(?:top|first|limit)\s+(?P<limit>\d+)'
+    r'|(?:status|state)\b\s*[:=]?\s*(?P<status>\w+)'
+    r')'
+)
+
+# Candidate server tool names for each operation, in order of preference
+_TOOL_CANDIDATES = {
+    'list': ['list_tables', 'list_table', 'show_tables', 'get_tables'],
+    'describe': ['describe_table', 'table_schema', 'show_columns', 'get_schema'],
+    'read': ['read_data', 'query_table', 'select_data', 'query'],
+}
+
+@lru_cache(maxsize=256)
+def _build_query(table_name: str, count: bool, has_location: bool, has_status: bool, has_limit: bool) -> str:
+    """SQL text for one query shape; values are bound through @loc/@status/@limit"""
+    if count:
+        query = f'SELECT COUNT(*) as total_count FROM [{table_name}]'
+    elif has_limit:
+        query = f'SELECT TOP (@limit) * FROM [{table_name}]'
+    else:
+        query = f'SELECT * FROM [{table_name}]'
+
+    clauses = []
+    if has_location:
+        clauses.append('(city LIKE @loc OR state LIKE @loc)')
+    if has_status:
+        clauses.append('status = @status')
+    if clauses:
+        query += ' WHERE ' + ' AND '.join(clauses)
+    return query
 
 class CustomSQLMCPAgent:
+    # Only these tables may be interpolated into SQL text
+    KNOWN_TABLES = frozenset(_TABLE_KEYWORDS)
+
     def __init__(self, mcp_server_path: str, connection_config: Dict[str, Any]):
         self.mcp_server_path = mcp_server_path
         self.connection_config = connection_config
-        self.mcp_process: Optional[subprocess.Popen] = None
+        options = connection_config.get("options", {})
+        self._encrypt = options.get("encrypt", True) is not False
+        self._trust_server_certificate = options.get("trustServerCertificate", True) is not False
+        self._env_overrides = self._build_env_overrides()
+        self.mcp_process: Optional[asyncio.subprocess.Process] = None
+        self._reader_tasks: List[asyncio.Task] = []
+        # Outgoing frames queued during one loop tick are written together
+        self._write_buf = bytearray()
+        self._flush_scheduled = False
+        self._drain_task: Optional[asyncio.Task] = None
         self.available_tools: List[Dict[str, Any]] = []
-        self.pending_requests: Dict[int, Dict[str, Any]] = {}
-        self.request_id_counter = 1
+        # Tool lookups, rebuilt whenever available_tools changes
+        self._tool_index: Dict[str, Dict[str, Any]] = {}
+        self._tool_for: Dict[str, Optional[str]] = {}
+        self._slots: List[Optional[_Pending]] = [None] * MAX_IN_FLIGHT
+        self._free_slots = deque(range(MAX_IN_FLIGHT))
+        self.request_id_counter = 0
+        # (deadline, request_id) min-heap swept by a single reaper task
+        self._deadlines: List[tuple] = []
+        self._deadline_added = asyncio.Event()
+        self._reaper_task: Optional[asyncio.Task] = None
+        # Set once the server logs that it is up or first speaks JSON-RPC
+        self._ready = asyncio.Event()
         self.config_path: Optional[str] = None
+        self.debug = os.getenv('MCP_AGENT_DEBUG', '').lower() in ('1', 'true', 'yes')
+
+    @property
+    def debug(self) -> bool:
+        return self._debug
+
+    @debug.setter
+    def debug(self, enabled: bool):
+        # Protocol traces go through the logger so payloads are only formatted when it is enabled
+        self._debug = enabled
+        logger.setLevel(logging.DEBUG if enabled else logging.INFO)
+
+    def _build_env_overrides(self) -> Dict[str, str]:
+        """Environment variables passed to the MCP server, computed once per agent"""
+        config = self.connection_config
+        port = str(config.get("port", 1433))
+        return {
+            # Standard environment variables
+            "MSSQL_SERVER": config["server"],
+            "MSSQL_USER": config["user"],
+            "MSSQL_PASSWORD": config["password"],
+            "MSSQL_DATABASE": config["database"],
+            "MSSQL_PORT": port,
+            "MSSQL_ENCRYPT": str(self._encrypt),
+            "MSSQL_TRUST_SERVER_CERTIFICATE": str(self._trust_server_certificate),
+            
+            # Alternative patterns
+            "DB_SERVER": config["server"],
+            "DB_USER": config["user"],
+            "DB_PASSWORD": config["password"],
+            "DB_DATABASE": config["database"],
+            "DB_PORT": port,
+            
+            # Connection string format
+            "DATABASE_URL": f"Server={config['server']};Database={config['database']};"
+                            f"User Id={config['user']};Password={config['password']};"
+                            "TrustServerCertificate=true;Encrypt=true;"
+        }
 
     async def initialize(self):
         print('🚀 Initializing Custom SQL MCP Agent...')
@@ -24,9 +206,10 @@ class CustomSQLMCPAgent:
         try:
             await self.create_config_file()
             await self.start_mcp_server()
-            await self.sleep(3000)  # Give server time to fully start
+            await self.wait_until_ready()
             await self.initialize_mcp_protocol()
-            await self.discover_tools()
+            # The initialized notification rides in the same write as tools/list
+            await self.discover_tools(preamble=_INITIALIZED_FRAME)
 
             print('✅ MCP Agent initialized successfully!')
             print(f'📊 Connected to database: {self.connection_config["database"]}')
@@ -36,8 +219,10 @@ class CustomSQLMCPAgent:
             raise error
 
     async def create_config_file(self):
-        """Create a temporary configuration file that the MCP server can read"""
-        config_path = Path(__file__).parent / 'temp_mcp_config.json'
+        """Create a temporary configuration file that the MCP server can read.
+
+        The file is named after a hash of its content, so a restart with the
+        same settings reuses the file an earlier run left behind."""
         config = {
             "server": self.connection_config["server"],
             "database": self.connection_config["database"],
@@ -45,46 +230,35 @@ class CustomSQLMCPAgent:
             "password": self.connection_config["password"],
             "port": self.connection_config.get("port", 1433),
             "options": {
-                "encrypt": self.connection_config.get("options", {}).get("encrypt", True) is not False,
-                "trustServerCertificate": self.connection_config.get("options", {}).get("trustServerCertificate", True) is not False
+                "encrypt": self._encrypt,
+                "trustServerCertificate": self._trust_server_certificate
             }
         }
 
-        with open(config_path, 'w') as f:
-            json.dump(config, f, indent=2)
-        
+        data = json.dumps(config, indent=2).encode('utf-8')
+        digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+        config_path = Path(tempfile.gettempdir()) / f'mcp_cfg_{digest}.json'
         self.config_path = str(config_path)
-        print(f'📝 Created temporary config file: {self.config_path}')
+        if config_path.exists():
+            return
 
-    async def sleep(self, ms: int):
-        await asyncio.sleep(ms / 1000)
+        # mkstemp creates the file 0600 (it holds the password); rename it
+        # into place so the server never sees a partial file
+        fd, tmp_path = tempfile.mkstemp(prefix='mcp_cfg_', suffix='.tmp', dir=config_path.parent)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, config_path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+        print(f'📝 Created temporary config file: {self.config_path}')
 
     async def start_mcp_server(self):
         """Start the MCP server process"""
-        # Prepare environment variables
-        env = os.environ.copy()
-        env.update({
-            # Standard environment variables
-            "MSSQL_SERVER": self.connection_config["server"],
-            "MSSQL_USER": self.connection_config["user"],
-            "MSSQL_PASSWORD": self.connection_config["password"],
-            "MSSQL_DATABASE": self.connection_config["database"],
-            "MSSQL_PORT": str(self.connection_config.get("port", 1433)),
-            "MSSQL_ENCRYPT": str(self.connection_config.get("options", {}).get("encrypt", True) is not False),
-            "MSSQL_TRUST_SERVER_CERTIFICATE": str(self.connection_config.get("options", {}).get("trustServerCertificate", True) is not False),
-            
-            # Alternative patterns
-            "DB_SERVER": self.connection_config["server"],
-            "DB_USER": self.connection_config["user"],
-            "DB_PASSWORD": self.connection_config["password"],
-            "DB_DATABASE": self.connection_config["database"],
-            "DB_PORT": str(self.connection_config.get("port", 1433)),
-            
-            # Connection string format
-            "DATABASE_URL": f"Server={self.connection_config['server']};Database={self.connection_config['database']};"
-                            f"User Id={self.connection_config['user']};Password={self.connection_config['password']};"
-                            "TrustServerCertificate=true;Encrypt=true;"
-        })
+        env = {**os.environ, **self._env_overrides}
 
         print('Starting MCP server with config:', {
             "server": self.connection_config["server"],
@@ -100,90 +274,129 @@ class CustomSQLMCPAgent:
             args.extend(['--config', self.config_path])
 
         try:
-            self.mcp_process = subprocess.Popen(
-                args,
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
+            self.mcp_process = await asyncio.create_subprocess_exec(
+                *args,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
                 env=env,
                 cwd=str(Path(self.mcp_server_path).parent),
-                text=True,
-                bufsize=1,
-                universal_newlines=True
+                limit=MCP_STREAM_LIMIT
             )
 
-            # Start threads to handle stdout and stderr
-            threading.Thread(target=self._handle_mcp_stdout, daemon=True).start()
-            threading.Thread(target=self._handle_mcp_stderr, daemon=True).start()
+            # Read stdout and stderr on the event loop
+            self._reader_tasks = [
+                asyncio.create_task(self._stdout_loop()),
+                asyncio.create_task(self._stderr_loop())
+            ]
+            self._reaper_task = asyncio.create_task(self._reap_timeouts())
 
-            # Wait briefly to check if process started
-            await self.sleep(2000)
-            if self.mcp_process.poll() is not None:
+            # Catch an immediate exit (bad path, missing node modules)
+            try:
+                await asyncio.wait_for(self.mcp_process.wait(), timeout=0.05)
+            except asyncio.TimeoutError:
+                pass
+            if self.mcp_process.returncode is not None:
                 raise Exception(f"MCP server failed to start. Exit code: {self.mcp_process.returncode}")
 
         except Exception as error:
             raise Exception(f"Failed to start MCP server: {str(error)}")
 
-    def _handle_mcp_stdout(self):
+    async def wait_until_ready(self):
+        """Wait for the server's readiness signal, failing fast if it exits"""
+        ready = asyncio.create_task(self._ready.wait())
+        exited = asyncio.create_task(self.mcp_process.wait())
+        try:
+            await asyncio.wait({ready, exited}, timeout=MCP_READY_TIMEOUT,
+                               return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            ready.cancel()
+            exited.cancel()
+
+        if self.mcp_process.returncode is not None:
+            raise Exception(f"MCP server exited during startup. Exit code: {self.mcp_process.returncode}")
+        if not self._ready.is_set():
+            print(f'⚠️  No readiness signal from MCP server after {MCP_READY_TIMEOUT:g}s, continuing')
+
+    async def _stdout_loop(self):
         """Handle stdout from the MCP server process"""
-        if self.mcp_process and self.mcp_process.stdout:
-            for line in iter(self.mcp_process.stdout.readline, ''):
-                line = line.strip()
-                if line:
-                    print(f'MCP Server Output: {line}')
-                    self.handle_mcp_response(line)
-
-    def _handle_mcp_stderr(self):
+        stdout = self.mcp_process.stdout
+        # Read in large chunks and split out complete NDJSON lines ourselves
+        buf = bytearray()
+        while True:
+            chunk = await stdout.read(MCP_READ_CHUNK)
+            if not chunk:
+                break
+            buf += chunk
+            # Only re-split when this chunk finished at least one line
+            if b'\n' not in chunk:
+                continue
+            *lines, buf = buf.split(b'\n')
+            for raw in lines:
+                self._handle_stdout_line(raw)
+        if buf:
+            self._handle_stdout_line(buf)
+
+    def _handle_stdout_line(self, raw: bytes):
+        # Strip the raw bytes, then decode the line once
+        raw = raw.strip()
+        if raw:
+            if b'"jsonrpc"' in raw:
+                self._ready.set()
+            line = raw.decode('utf-8', 'replace')
+            logger.debug('MCP Server Output: %s', line)
+            self.handle_mcp_response(line)
+
+    async def _stderr_loop(self):
         """Handle stderr from the MCP server process"""
-        if self.mcp_process and self.mcp_process.stderr:
-            for line in iter(self.mcp_process.stderr.readline, ''):
-                line = line.strip()
-                if line:
-                    print(f'MCP Server Error: {line}', file=sys.stderr)
-                    # Check for specific configuration errors
-                    if "config.server" in line or "configuration" in line:
-                        print(f"MCP Server configuration error: {line}", file=sys.stderr)
+        stderr = self.mcp_process.stderr
+        while True:
+            raw = await stderr.readline()
+            if not raw:
+                break
+            raw = raw.strip()
+            if raw:
+                if not self._ready.is_set() and _READY_RE.search(raw):
+                    self._ready.set()
+                line = raw.decode('utf-8', 'replace')
+                print(f'MCP Server Error: {line}', file=sys.stderr)
+                # Check for specific configuration errors
+                if _CONFIG_ERROR_RE.search(raw):
+                    print(f"MCP Server configuration error: {line}", file=sys.stderr)
 
     async def initialize_mcp_protocol(self):
         print('Initializing MCP protocol...')
-        init_message = {
-            "jsonrpc": "2.0",
-            "id": self.get_next_request_id(),
-            "method": "initialize",
-            "params": {
-                "protocolVersion": "2024-11-05",
-                "capabilities": {
-                    "roots": {"listChanged": True},
-                    "sampling": {}
-                },
-                "clientInfo": {
-                    "name": "Custom SQL MCP Agent",
-                    "version": "1.0.0"
-                }
-            }
-        }
+        request_id = self.get_next_request_id()
+        init_frame = _INIT_FRAME_HEAD + str(request_id).encode('ascii') + _INIT_FRAME_TAIL
 
         try:
-            response = await self.send_mcp_message(init_message)
+            response = await self._send_request(request_id, init_frame)
             print('MCP protocol initialized:', 'Success' if response.get('result') else 'Failed')
-            
-            # Send initialized notification
-            initialized_message = {
-                "jsonrpc": "2.0",
-                "method": "notifications/initialized",
-                "params": {}
-            }
-            
-            self.send_mcp_notification(initialized_message)
         except Exception as error:
             print(f'Failed to initialize MCP protocol: {str(error)}')
             raise error
 
     def get_next_request_id(self) -> int:
+        """Reserve a free slot; the id must then be passed to _send_request"""
+        if not self._free_slots:
+            raise Exception(f'Too many in-flight MCP requests (max {MAX_IN_FLIGHT})')
         self.request_id_counter += 1
-        return self.request_id_counter
+        return (self.request_id_counter << _SLOT_BITS) | self._free_slots.popleft()
 
-    async def discover_tools(self):
+    def _encode_request(self, message: Dict[str, Any]) -> bytes:
+        """Encode a request whose id is reserved, releasing the slot if encoding fails"""
+        try:
+            return _encode_frame(message)
+        except BaseException:
+            self._free_slots.append(message['id'] & _SLOT_MASK)
+            raise
+
+    @property
+    def pending_count(self) -> int:
+        return MAX_IN_FLIGHT - len(self._free_slots)
+
+    async def discover_tools(self, preamble: bytes = b''):
+        """List the server's tools; ``preamble`` frames are sent in the same write"""
         print('Discovering available tools...')
         tools_message = {
             "jsonrpc": "2.0",
@@ -193,80 +406,140 @@ class CustomSQLMCPAgent:
         }
 
         try:
-            response = await self.send_mcp_message(tools_message)
+            # The response future is registered before the combined write goes out
+            response = await self._send_request(tools_message['id'], preamble + self._encode_request(tools_message))
 
             if response and response.get('result', {}).get('tools'):
                 self.available_tools = response['result']['tools']
+                self._index_tools()
                 print('\n📋 Available Database Tools:')
                 for tool in self.available_tools:
                     print(f'   • {tool["name"]}: {tool["description"]}')
             else:
-                print('No tools discovered. Response:', json.dumps(response, indent=2))
+                print('No tools discovered. Response:', json_pretty(response))
                 await self.try_alternative_tool_discovery()
         except Exception as error:
             print(f'Error discovering tools: {str(error)}')
             raise error
 
+    def _index_tools(self):
+        """Index discovered tools by name and resolve the tool for each operation"""
+        self._tool_index = {tool['name']: tool for tool in self.available_tools}
+        self._tool_for = {
+            operation: self.find_tool_by_name(names)
+            for operation, names in _TOOL_CANDIDATES.items()
+        }
+
     async def try_alternative_tool_discovery(self):
         print('Trying alternative tool discovery methods...')
         methods = ['tools/list', 'list_tools', 'get_tools', 'capabilities']
         
-        for method in methods:
-            try:
-                response = await self.send_mcp_message({
-                    "jsonrpc": "2.0",
-                    "id": self.get_next_request_id(),
-                    "method": method,
-                    "params": {}
-                })
-                
-                if response and response.get('result'):
-                    print(f'Method {method} returned:', json.dumps(response['result'], indent=2))
-            except Exception as error:
-                print(f'Method {method} failed: {str(error)}')
+        # Send all probes at once so they go out in a single write; each
+        # reserves its own id, so one that finds no free slot fails alone
+        responses = await asyncio.gather(*[
+            self._request(method, {}) for method in methods
+        ], return_exceptions=True)
+        
+        for method, response in zip(methods, responses):
+            if isinstance(response, Exception):
+                print(f'Method {method} failed: {str(response)}')
+            elif response and response.get('result'):
+                print(f'Method {method} returned:', json_pretty(response['result']))
 
     async def send_mcp_message(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        frame = self._encode_request(message)
+        return await self._send_request(message['id'], frame)
+
+    async def _request(self, method: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        return await self.send_mcp_message({
+            "jsonrpc": "2.0",
+            "id": self.get_next_request_id(),
+            "method": method,
+            "params": params
+        })
+
+    async def _call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        return await self._request("tools/call", {
+            "name": tool_name,
+            "arguments": arguments
+        })
+
+    async def _send_request(self, request_id: int, frame: bytes) -> Dict[str, Any]:
+        """Send an encoded request frame and wait for the matching response"""
         loop = asyncio.get_event_loop()
-        future = loop.create_future()
-        
-        message_str = json.dumps(message) + '\n'
+        slot = request_id & _SLOT_MASK
         
-        if not self.mcp_process or self.mcp_process.poll() is not None:
+        if not self.mcp_process or self.mcp_process.returncode is not None:
+            self._free_slots.append(slot)
             raise Exception('MCP process not available')
 
-        print('Sending MCP message:', json.dumps(message, indent=2))
+        # Register before writing: the response is read on this same loop
+        pending = self._slots[slot] = _Pending(request_id, loop.create_future())
 
         try:
-            self.mcp_process.stdin.write(message_str)
-            self.mcp_process.stdin.flush()
-            
-            self.pending_requests[message['id']] = {
-                'future': future,
-                'timestamp': time.time()
-            }
+            logger.debug('Sending MCP message: %s', LazyJSON(frame))
 
-            # Set timeout for request
-            def timeout_callback():
-                if message['id'] in self.pending_requests:
-                    del self.pending_requests[message['id']]
-                    future.set_exception(Exception(f"Request timeout for message ID: {message['id']}"))
+            self._queue_write(frame)
 
-            loop.call_later(15, timeout_callback)
+            # Set timeout for request
+            heapq.heappush(self._deadlines, (loop.time() + MCP_REQUEST_TIMEOUT, request_id))
+            self._deadline_added.set()
             
-            return await future
+            return await pending.future
         except Exception as error:
             raise Exception(f"Failed to send message: {str(error)}")
-
-    def send_mcp_notification(self, message: Dict[str, Any]):
-        message_str = json.dumps(message) + '\n'
-        print('Sending MCP notification:', json.dumps(message, indent=2))
+        finally:
+            # Hand the slot back on every outcome
+            self._slots[slot] = None
+            self._free_slots.append(slot)
+
+    async def _reap_timeouts(self):
+        """Fail requests past their deadline; entries already answered are skipped"""
+        loop = asyncio.get_running_loop()
+        deadlines = self._deadlines
+        while True:
+            if not deadlines:
+                self._deadline_added.clear()
+                await self._deadline_added.wait()
+                continue
+
+            deadline, request_id = deadlines[0]
+            delay = deadline - loop.time()
+            if delay > 0:
+                # Deadlines share one timeout, so later pushes never jump the queue
+                await asyncio.sleep(delay)
+                continue
+
+            heapq.heappop(deadlines)
+            pending = self._slots[request_id & _SLOT_MASK]
+            if pending is not None and pending.request_id == request_id and not pending.future.done():
+                pending.future.set_exception(Exception(f"Request timeout for message ID: {request_id}"))
+
+    def _queue_write(self, data: bytes):
+        """Buffer an outgoing frame; everything queued this tick is flushed at once"""
+        self._write_buf += data
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            asyncio.get_running_loop().call_soon(self._flush_writes)
+
+    def _flush_writes(self):
+        self._flush_scheduled = False
+        if not self._write_buf:
+            return
+        if not self.mcp_process or self.mcp_process.returncode is not None:
+            self._write_buf.clear()
+            return
         
-        if self.mcp_process and self.mcp_process.poll() is None:
-            try:
-                self.mcp_process.stdin.write(message_str)
-                self.mcp_process.stdin.flush()
-            except Exception as error:
-                print(f'Failed to send notification: {str(error)}')
+        self.mcp_process.stdin.write(bytes(self._write_buf))
+        self._write_buf.clear()
+        if self._drain_task is None or self._drain_task.done():
+            self._drain_task = asyncio.create_task(self._drain())
+
+    async def _drain(self):
+        try:
+            await self.mcp_process.stdin.drain()
+        except (ConnectionError, OSError) as error:
+            print(f'Failed to send message: {str(error)}')
 
     def handle_mcp_response(self, data: str):
         try:
@@ -274,13 +547,14 @@ class CustomSQLMCPAgent:
                 return
 
             try:
-                response = json.loads(data)
-                print('Received MCP response:', json.dumps(response, indent=2))
+                response = json_loads(data)
+                logger.debug('Received MCP response: %s', LazyJSON(response))
                 
                 # Handle responses with IDs (requests)
-                if 'id' in response and response['id'] in self.pending_requests:
-                    future = self.pending_requests[response['id']]['future']
-                    del self.pending_requests[response['id']]
+                request_id = response.get('id') if isinstance(response, dict) else None
+                pending = self._slots[request_id & _SLOT_MASK] if type(request_id) is int else None
+                if pending is not None and pending.request_id == request_id and not pending.future.done():
+                    future = pending.future
                     
                     if 'error' in response:
                         future.set_exception(Exception(response['error'].get('message', json.dumps(response['error']))))
@@ -318,74 +592,25 @@ class CustomSQLMCPAgent:
     def analyze_user_input(self, input_str: str) -> Dict[str, Any]:
         input_lower = input_str.lower()
 
-        intent = 'SELECT'
-        if any(word in input_lower for word in ['show', 'list', 'get', 'find', 'select', 'display']):
-            intent = 'SELECT'
-        elif any(word in input_lower for word in ['count', 'how many', 'total']):
-            intent = 'COUNT'
-        elif any(word in input_lower for word in ['create', 'add', 'insert']):
-            intent = 'INSERT'
-        elif any(word in input_lower for word in ['update', 'change', 'modify']):
-            intent = 'UPDATE'
-        elif any(word in input_lower for word in ['delete', 'remove', 'drop']):
-            intent = 'DELETE'
-        elif any(word in input_lower for word in ['describe', 'structure', 'schema', 'columns']):
-            intent = 'DESCRIBE'
-
-        tables = []
-        table_keywords = {
-            'customers': ['customer', 'client', 'user'],
-            'orders': ['order', 'purchase', 'sale'],
-            'products': ['product', 'item'],
-            'employees': ['employee', 'staff', 'worker'],
-            'payments': ['payment', 'invoice', 'billing'],
-            'support_tickets': ['ticket', 'issue', 'support']
-        }
+        # Collect every intent mentioned, then apply the fixed priority order
+        found_intents = {match.lastgroup for match in _INTENT_RE.finditer(input_lower)}
+        intent = next((name for name in _INTENT_PRIORITY if name in found_intents), 'SELECT')
 
-        for table, keywords in table_keywords.items():
-            if any(keyword in input_lower for keyword in keywords):
-                tables.append(table)
+        found_tables = {match.lastgroup for match in _TABLE_RE.finditer(input_lower)}
+        tables = [table for table in _TABLE_KEYWORDS if table in found_tables]
 
+        # Extract location, limit and status conditions
         conditions = {}
-        
-        # Extract location condition
-        location_match = None
-        for word in ['from', 'in']:
-            if word in input_lower:
-                parts = input_lower.split(word, 1)
-                if len(parts) > 1:
-                    location_match = parts[1].split()[0]
-                    break
-        
-        if location_match:
-            conditions['location'] = location_match.strip()
-
-        # Extract limit condition
-        limit_match = None
-        for word in ['top', 'first', 'limit']:
-            if word in input_lower:
-                parts = input_lower.split(word, 1)
-                if len(parts) > 1:
-                    try:
-                        limit_match = int(parts[1].split()[0])
-                        break
-                    except (ValueError, IndexError):
-                        pass
-        
-        if limit_match:
-            conditions['limit'] = limit_match
-
-        # Extract status condition
-        status_match = None
-        for word in ['status', 'state']:
-            if word in input_lower:
-                parts = input_lower.split(word, 1)
-                if len(parts) > 1:
-                    status_match = parts[1].split()[0]
-                    break
-        
-        if status_match:
-            conditions['status'] = status_match
+        for match in _CONDITION_RE.finditer(input_lower):
+            kind = match.lastgroup
+            if kind in conditions:
+                continue
+            value = match.group(kind)
+            if kind == 'limit':
+                value = int(value)
+                if not value:
+                    continue
+            conditions[kind] = value
 
         return {
             "intent": intent,
@@ -422,130 +647,82 @@ class CustomSQLMCPAgent:
             raise error
 
     async def list_all_tables(self) -> Dict[str, Any]:
-        tool_name = self.find_tool_by_name(['list_tables', 'list_table', 'show_tables', 'get_tables'])
+        tool_name = self._tool_for.get('list')
         if not tool_name:
             print('Available tools:', [t["name"] for t in self.available_tools])
             raise Exception('No table listing tool found')
 
-        return await self.send_mcp_message({
-            "jsonrpc": "2.0",
-            "id": self.get_next_request_id(),
-            "method": "tools/call",
-            "params": {
-                "name": tool_name,
-                "arguments": {}
-            }
-        })
+        return await self._call_tool(tool_name, {})
 
     async def describe_table(self, table_name: str) -> Dict[str, Any]:
-        tool_name = self.find_tool_by_name(['describe_table', 'table_schema', 'show_columns', 'get_schema'])
+        tool_name = self._tool_for.get('describe')
         if not tool_name:
             raise Exception('No table description tool found')
 
-        return await self.send_mcp_message({
-            "jsonrpc": "2.0",
-            "id": self.get_next_request_id(),
-            "method": "tools/call",
-            "params": {
-                "name": tool_name,
-                "arguments": {"table_name": table_name}
-            }
-        })
+        return await self._call_tool(tool_name, {"table_name": table_name})
 
     async def read_table_data(self, table_name: str, conditions: Dict[str, Any] = {}) -> Dict[str, Any]:
-        tool_name = self.find_tool_by_name(['read_data', 'query_table', 'select_data', 'query'])
-        if not tool_name:
-            raise Exception('No data reading tool found')
-
-        query = f'SELECT * FROM {table_name}'
-        args = {}
-
-        if conditions.get('where_clause'):
-            query += f' WHERE {conditions["where_clause"]}'
-        
-        if conditions.get('limit'):
-            query += f' LIMIT {conditions["limit"]}'
-            args['limit'] = conditions['limit']
-        
-        if conditions.get('location'):
-            args['where_clause'] = f"city LIKE '%{conditions['location']}%' OR state LIKE '%{conditions['location']}%'"
-        
-        if conditions.get('status'):
-            status_clause = f"status = '{conditions['status']}'"
-            args['where_clause'] = f"({args['where_clause']}) AND {status_clause}" if 'where_clause' in args else status_clause
-
-        args['query'] = query
-
-        return await self.send_mcp_message({
-            "jsonrpc": "2.0",
-            "id": self.get_next_request_id(),
-            "method": "tools/call",
-            "params": {
-                "name": tool_name,
-                "arguments": args
-            }
-        })
+        return await self._query_table(table_name, conditions, count=False)
 
     async def count_table_records(self, table_name: str, conditions: Dict[str, Any] = {}) -> Dict[str, Any]:
-        tool_name = self.find_tool_by_name(['read_data', 'query_table', 'select_data', 'query'])
+        return await self._query_table(table_name, conditions, count=True)
+
+    async def _query_table(self, table_name: str, conditions: Dict[str, Any], count: bool) -> Dict[str, Any]:
+        """Run a parameterized SELECT / COUNT against an allow-listed table"""
+        tool_name = self._tool_for.get('read')
         if not tool_name:
             raise Exception('No data reading tool found')
-
-        query = f'SELECT COUNT(*) as total_count FROM {table_name}'
-        args = {}
-
-        if conditions.get('where_clause'):
-            query += f' WHERE {conditions["where_clause"]}'
-        
-        if conditions.get('location'):
-            args['where_clause'] = f"city LIKE '%{conditions['location']}%' OR state LIKE '%{conditions['location']}%'"
-        
-        if conditions.get('status'):
-            status_clause = f"status = '{conditions['status']}'"
-            args['where_clause'] = f"({args['where_clause']}) AND {status_clause}" if 'where_clause' in args else status_clause
-
-        args['query'] = query
-
-        return await self.send_mcp_message({
-            "jsonrpc": "2.0",
-            "id": self.get_next_request_id(),
-            "method": "tools/call",
-            "params": {
-                "name": tool_name,
-                "arguments": args
-            }
-        })
+        if table_name not in self.KNOWN_TABLES:
+            raise Exception(f'Unknown table: {table_name}')
+
+        location = conditions.get('location')
+        status = conditions.get('status')
+        limit = None if count else conditions.get('limit')
+
+        # User values travel as parameters so the SQL text stays constant per shape
+        parameters = {}
+        if location:
+            parameters['loc'] = f'%{location}%'
+        if status:
+            parameters['status'] = status
+        if limit:
+            parameters['limit'] = int(limit)
+
+        args = {"query": _build_query(table_name, count, bool(location), bool(status), bool(limit))}
+        if parameters:
+            args['parameters'] = parameters
+        if limit:
+            args['limit'] = int(limit)
+
+        return await self._call_tool(tool_name, args)
 
     def find_tool_by_name(self, possible_names: List[str]) -> Optional[str]:
-        for name in possible_names:
-            for tool in self.available_tools:
-                if tool['name'] == name:
-                    return tool['name']
-        return None
+        return next((name for name in possible_names if name in self._tool_index), None)
 
     def display_results(self, result: Dict[str, Any], original_query: str):
-        print('\n📊 Results:')
-        print('─' * 50)
+        # Assemble the whole block and hand it to stdout in one write
+        parts = ['\n📊 Results:', _RULE]
 
         if result and 'error' in result:
-            print(f'❌ Error: {result["error"].get("message", result["error"])}')
+            parts.append(f'❌ Error: {result["error"].get("message", result["error"])}')
         elif result and result.get('result', {}).get('content'):
             content = result['result']['content']
             if isinstance(content, list):
                 for item in content:
                     if isinstance(item, dict) and item.get('type') == 'text':
-                        print(item['text'])
+                        parts.append(str(item['text']))
                     else:
-                        print(json.dumps(item, indent=2))
+                        parts.append(json_pretty(item))
             elif isinstance(content, str):
-                print(content)
+                parts.append(content)
             else:
-                print(json.dumps(content, indent=2))
+                parts.append(json_pretty(content))
         else:
-            print('No results returned')
-            print('Full response:', json.dumps(result, indent=2))
+            parts.append('No results returned')
+            parts.append(f'Full response: {json_pretty(result)}')
 
-        print('─' * 50)
+        parts.append(_RULE)
+        sys.stdout.write('\n'.join(parts) + '\n')
 
     async def start_interactive_session(self):
         print('\n🎯 MCP Agent Ready!')
@@ -559,14 +736,14 @@ class CustomSQLMCPAgent:
 
         while True:
             try:
-                user_input = input('🗣️  You: ').strip()
+                user_input = (await ainput('🗣️  You: ')).strip()
                 
                 if not user_input:
                     continue
                 
                 if user_input.lower() == 'exit':
                     print('👋 Closing MCP Agent...')
-                    self.cleanup()
+                    await self.cleanup()
                     return
                 
                 if user_input.lower() == 'tools':
@@ -581,43 +758,173 @@ class CustomSQLMCPAgent:
                 
                 if user_input.lower() == 'debug':
                     print('\n🔍 Debug Information:')
-                    print('MCP Process alive:', self.mcp_process and self.mcp_process.poll() is None)
+                    print('MCP Process alive:', self.mcp_process and self.mcp_process.returncode is None)
                     print('Available tools:', len(self.available_tools))
-                    print('Pending requests:', len(self.pending_requests))
+                    print('Pending requests:', self.pending_count)
                     print('')
                     continue
                 
                 await self.process_natural_language_query(user_input)
                 print('\n')
                 
-            except KeyboardInterrupt:
+            except (KeyboardInterrupt, EOFError):
                 print('\n👋 Shutting down...')
-                self.cleanup()
+                await self.cleanup()
                 return
             except Exception as error:
                 print(f'Error: {str(error)}')
 
-    def cleanup(self):
+    @property
+    def is_alive(self) -> bool:
+        return self.mcp_process is not None and self.mcp_process.returncode is None
+
+    def reset(self):
+        """Fail anything still in flight so the next session starts clean"""
+        for pending in self._slots:
+            if pending is not None and not pending.future.done():
+                pending.future.set_exception(Exception(f"Request cancelled for message ID: {pending.request_id}"))
+
+    async def cleanup(self):
         print('Cleaning up resources...')
         
-        # Clean up temporary config file
-        if self.config_path and os.path.exists(self.config_path):
-            try:
-                os.unlink(self.config_path)
-                print('Removed temporary config file')
-            except Exception as error:
-                print(f'Error removing config file: {str(error)}')
-        
-        if self.mcp_process and self.mcp_process.poll() is None:
+        # The content-addressed config file is kept for the next run
+        await self.close()
+        sys.exit(0)
+
+    async def close(self):
+        """Stop the MCP server process and the tasks reading from it"""
+        if self.mcp_process and self.mcp_process.returncode is None:
             self.mcp_process.terminate()
             try:
-                self.mcp_process.wait(timeout=5)
-            except subprocess.TimeoutExpired:
+                await asyncio.wait_for(self.mcp_process.wait(), timeout=5)
+            except asyncio.TimeoutError:
                 self.mcp_process.kill()
         
-        sys.exit(0)
+        for task in self._reader_tasks:
+            task.cancel()
+        if self._reaper_task:
+            self._reaper_task.cancel()
+
+class MCPProcessPool:
+    """Pool of initialized agents, each owning its own MCP server process.
+    
+    Starting node and connecting to the database takes seconds, so sessions
+    borrow an agent that is already up. Agents go back to the pool after use
+    and are only replaced when their server process has died or the caller
+    discards them after a protocol error. A failed replacement is retried
+    with backoff; once no agent is live or starting, acquire() raises
+    instead of waiting forever.
+    """
+    
+    refill_attempts = 5
+    refill_backoff = 1.0
+    refill_backoff_max = 30.0
+    
+    def __init__(self, mcp_server_path: str, connection_config: Dict[str, Any], size: int = 2):
+        self.mcp_server_path = mcp_server_path
+        self.connection_config = connection_config
+        self.size = size
+        # Idle agents; a None entry means the pool has run out of agents
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._refills: set = set()
+        self._live = 0
+    
+    async def _spawn(self) -> CustomSQLMCPAgent:
+        agent = CustomSQLMCPAgent(self.mcp_server_path, self.connection_config)
+        try:
+            await agent.initialize()
+        except BaseException:
+            # Also on cancellation, so a half-started server is not left running
+            await agent.close()
+            raise
+        self._live += 1
+        return agent
+    
+    async def open(self):
+        """Start ``size`` agents concurrently"""
+        results = await asyncio.gather(
+            *(self._spawn() for _ in range(self.size)), return_exceptions=True
+        )
+        for result in results:
+            if not isinstance(result, BaseException):
+                self._idle.put_nowait(result)
+        if self._idle.empty() and results:
+            raise results[0]
+    
+    def _replace(self):
+        # Start the replacement in the background so release() stays cheap
+        task = asyncio.create_task(self._refill())
+        self._refills.add(task)
+        task.add_done_callback(self._refills.discard)
+    
+    async def _refill(self):
+        delay = self.refill_backoff
+        for attempt in range(1, self.refill_attempts + 1):
+            try:
+                self._idle.put_nowait(await self._spawn())
+                return
+            except Exception as error:
+                print(f'❌ Failed to start replacement MCP server '
+                      f'(attempt {attempt}/{self.refill_attempts}): {str(error)}')
+            if attempt < self.refill_attempts:
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.refill_backoff_max)
+        
+        # Out of retries: if nothing else can ever fill the queue, wake the waiters.
+        # Drop this task first; its done callback only runs after we return, so
+        # two refills failing together would otherwise each wait on the other.
+        self._refills.discard(asyncio.current_task())
+        if not self._live and not self._refills:
+            self._idle.put_nowait(None)
+    
+    async def _retire(self, agent: CustomSQLMCPAgent):
+        self._live -= 1
+        await agent.close()
+        self._replace()
+    
+    async def acquire(self) -> CustomSQLMCPAgent:
+        """Take an idle agent, waiting for one if all are in use"""
+        while True:
+            if self._idle.empty() and not self._live and not self._refills:
+                raise Exception('No MCP server processes available')
+            agent = await self._idle.get()
+            if agent is None:
+                # Leave the marker for the next waiter
+                self._idle.put_nowait(None)
+                raise Exception('No MCP server processes available')
+            if agent.is_alive:
+                return agent
+            await self._retire(agent)
+    
+    async def release(self, agent: CustomSQLMCPAgent, discard: bool = False):
+        """Return an agent; a dead or discarded one is killed and replaced"""
+        if discard or not agent.is_alive:
+            await self._retire(agent)
+            return
+        agent.reset()
+        self._idle.put_nowait(agent)
+    
+    @asynccontextmanager
+    async def session(self):
+        agent = await self.acquire()
+        try:
+            yield agent
+        finally:
+            await self.release(agent)
+    
+    async def close(self):
+        """Stop idle agents and any replacements still starting"""
+        for task in self._refills:
+            task.cancel()
+        while not self._idle.empty():
+            agent = self._idle.get_nowait()
+            if agent is not None:
+                self._live -= 1
+                await agent.close()
 
 async def main():
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
+
     mcp_server_path = 'D:/MCP_server_client/SQL-AI-samples/MssqlMcp/Node/dist/index.js'
 
     connection_config = {
@@ -660,8 +967,6 @@ def signal_handler(sig, frame):
     sys.exit(0)
 
 if __name__ == '__main__':
-    import asyncio
-    
     # Set up signal handlers
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
@@ -0,0 +1,26 @@
+import shutil
+import tempfile
+from pathlib import Path
+
+import pytest
+
+FAKE_SERVER = str(Path(__file__).with_name("fake_mcp_server.js"))
+
+
+@pytest.fixture
+def server_config(tmp_path, monkeypatch):
+    """Path and connection config for an agent talking to the fake MCP server"""
+    if shutil.which("node") is None:
+        pytest.skip("node is not installed")
+    # Keep the agent's config files out of the real temp directory
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    monkeypatch.delenv("FAKE_MCP_EXIT", raising=False)
+    config = {
+        "user": "sa",
+        "password": "password",
+        "server": "localhost",
+        "database": "testdb",
+        "port": 1433,
+        "options": {},
+    }
+    return FAKE_SERVER, config
@@ -0,0 +1,62 @@
+// Minimal stdio MCP server for the agent tests.
+// Tools: echo replies at once, sleep replies after arguments.delay seconds,
+// hang never replies. FAKE_MCP_EXIT makes the process exit before starting.
+const readline = require('readline');
+
+if (process.env.FAKE_MCP_EXIT) {
+    process.exit(1);
+}
+
+const TOOLS = [
+    { name: 'echo', description: 'Echo the arguments back' },
+    { name: 'sleep', description: 'Echo the arguments back after a delay' },
+    { name: 'hang', description: 'Never reply' },
+];
+
+function reply(id, result) {
+    process.stdout.write(JSON.stringify({ jsonrpc: '2.0', id, result }) + '\n');
+}
+
+function replyError(id, message) {
+    process.stdout.write(JSON.stringify({ jsonrpc: '2.0', id, error: { code: -32601, message } }) + '\n');
+}
+
+function text(value) {
+    return { content: [{ type: 'text', text: JSON.stringify(value) }] };
+}
+
+const rl = readline.createInterface({ input: process.stdin });
+
+rl.on('line', (line) => {
+    if (!line.trim()) {
+        return;
+    }
+    const message = JSON.parse(line);
+    if (message.id === undefined) {
+        return;
+    }
+
+    switch (message.method) {
+        case 'initialize':
+            reply(message.id, { protocolVersion: '2024-11-05', capabilities: {} });
+            break;
+        case 'tools/list':
+            reply(message.id, { tools: TOOLS });
+            break;
+        case 'tools/call': {
+            const { name, arguments: args } = message.params;
+            if (name === 'echo') {
+                reply(message.id, text({ args }));
+            } else if (name === 'sleep') {
+                setTimeout(() => reply(message.id, text({ args })), args.delay * 1000);
+            } else if (name !== 'hang') {
+                replyError(message.id, `Unknown tool: ${name}`);
+            }
+            break;
+        }
+        default:
+            replyError(message.id, `Method '${message.method}' not found`);
+    }
+});
+
+console.error('Fake MCP server running on stdio');
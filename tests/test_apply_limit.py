@@ -0,0 +1,22 @@
+import pytest
+
+pytest.importorskip("pyodbc")
+pytest.importorskip("fastapi")
+
+from server2 import _apply_limit
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("SELECT * FROM t", "SELECT TOP (5) * FROM t"),
+    ("  select id from t", "  select TOP (5) id from t"),
+    ("select distinct col from t", "select distinct TOP (5) col from t"),
+    ("SELECT ALL col FROM t", "SELECT ALL TOP (5) col FROM t"),
+    ("SELECT allowed FROM t", "SELECT TOP (5) allowed FROM t"),
+])
+def test_adds_top_after_select_and_distinct(query, expected):
+    assert _apply_limit(query, 5) == (expected, True)
+
+
+def test_leaves_bounded_and_non_select_queries_alone():
+    assert _apply_limit("SELECT TOP 3 * FROM t", 5) == ("SELECT TOP 3 * FROM t", True)
+    assert _apply_limit("UPDATE t SET a = 1", 5) == ("UPDATE t SET a = 1", False)
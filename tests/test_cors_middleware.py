@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("pyodbc")
+pytest.importorskip("fastapi")
+
+from server2 import CORSASGIMiddleware
+
+
+async def app(scope, receive, send):
+    await send({
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [(b"content-type", b"text/plain"), (b"access-control-allow-origin", b"*")],
+    })
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+def call(method="GET", headers=(), scope_type="http"):
+    scope = {"type": scope_type, "method": method, "headers": list(headers)}
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(CORSASGIMiddleware(app)(scope, None, send))
+    return sent[0]["status"], dict(sent[0]["headers"])
+
+
+def test_same_origin_request_is_untouched():
+    status, headers = call()
+    assert status == 200
+    assert headers == {b"content-type": b"text/plain", b"access-control-allow-origin": b"*"}
+
+
+def test_cross_origin_response_echoes_origin():
+    status, headers = call(headers=[(b"origin", b"http://example.com")])
+    assert status == 200
+    assert headers[b"access-control-allow-origin"] == b"http://example.com"
+    assert headers[b"access-control-allow-credentials"] == b"true"
+    assert headers[b"vary"] == b"Origin"
+    assert headers[b"content-type"] == b"text/plain"
+
+
+def test_preflight_is_answered_without_calling_the_app():
+    status, headers = call("OPTIONS", [
+        (b"origin", b"http://example.com"),
+        (b"access-control-request-method", b"POST"),
+        (b"access-control-request-headers", b"content-type"),
+    ])
+    assert status == 204
+    assert headers[b"access-control-allow-origin"] == b"http://example.com"
+    assert headers[b"access-control-allow-methods"] == CORSASGIMiddleware.ALLOW_METHODS
+    assert headers[b"access-control-allow-headers"] == b"content-type"
+    assert b"content-type" not in headers
+
+
+def test_non_http_scopes_pass_through():
+    status, headers = call(scope_type="websocket", headers=[(b"origin", b"http://example.com")])
+    assert headers[b"access-control-allow-origin"] == b"*"
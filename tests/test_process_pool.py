@@ -0,0 +1,137 @@
+import asyncio
+
+import pytest
+
+from sql_mcp_agent_python import MCPProcessPool
+
+
+def run(coro, timeout=20):
+    return asyncio.run(asyncio.wait_for(coro, timeout))
+
+
+def make_pool(server_config, size):
+    pool = MCPProcessPool(*server_config, size=size)
+    pool.refill_attempts = 2
+    pool.refill_backoff = 0.01
+    return pool
+
+
+async def settle(pool):
+    """Wait for background refills to finish"""
+    while pool._refills:
+        await asyncio.gather(*pool._refills, return_exceptions=True)
+
+
+def test_acquire_and_release_reuse_agents(server_config):
+    async def scenario():
+        pool = make_pool(server_config, 2)
+        await pool.open()
+        try:
+            async with pool.session() as agent:
+                assert agent.is_alive
+                response = await agent._call_tool("echo", {"n": 1})
+                assert '"n":1' in response["result"]["content"][0]["text"]
+            assert pool._idle.qsize() == 2
+            agents = [await pool.acquire(), await pool.acquire()]
+            assert agent in agents
+            for borrowed in agents:
+                await pool.release(borrowed)
+        finally:
+            await pool.close()
+        return agent
+
+    agent = run(scenario())
+    assert not agent.is_alive
+
+
+def test_discarded_and_dead_agents_are_replaced(server_config):
+    async def scenario():
+        pool = make_pool(server_config, 1)
+        await pool.open()
+        try:
+            first = await pool.acquire()
+            await pool.release(first, discard=True)
+            assert not first.is_alive
+            await settle(pool)
+
+            second = await pool.acquire()
+            assert second is not first and second.is_alive
+            second.mcp_process.kill()
+            await second.mcp_process.wait()
+            await pool.release(second)
+            await settle(pool)
+
+            third = await pool.acquire()
+            assert third not in (first, second) and third.is_alive
+            await pool.release(third)
+            assert pool._live == 1
+        finally:
+            await pool.close()
+
+    run(scenario())
+
+
+def test_open_raises_when_no_server_starts(server_config, monkeypatch):
+    monkeypatch.setenv("FAKE_MCP_EXIT", "1")
+
+    async def scenario():
+        pool = make_pool(server_config, 2)
+        with pytest.raises(Exception, match="exited|failed to start"):
+            await pool.open()
+        assert pool._live == 0
+
+    run(scenario())
+
+
+def test_acquire_raises_once_refills_give_up(server_config, monkeypatch):
+    async def scenario():
+        pool = make_pool(server_config, 1)
+        await pool.open()
+        agent = await pool.acquire()
+        monkeypatch.setenv("FAKE_MCP_EXIT", "1")
+        await pool.release(agent, discard=True)
+        await settle(pool)
+        for _ in range(2):
+            with pytest.raises(Exception, match="No MCP server processes available"):
+                await pool.acquire()
+        await pool.close()
+
+    run(scenario())
+
+
+def test_blocked_waiter_wakes_when_concurrent_refills_fail(server_config, monkeypatch):
+    async def scenario():
+        pool = make_pool(server_config, 2)
+        await pool.open()
+        first = await pool.acquire()
+        second = await pool.acquire()
+        waiter = asyncio.create_task(pool.acquire())
+        await asyncio.sleep(0)
+
+        # Both refills fail on the same ticks, so each sees the other still running
+        async def broken_spawn():
+            raise Exception("spawn failed")
+        monkeypatch.setattr(pool, "_spawn", broken_spawn)
+        await pool.release(first, discard=True)
+        await pool.release(second, discard=True)
+        with pytest.raises(Exception, match="No MCP server processes available"):
+            await asyncio.wait_for(waiter, 10)
+        assert pool._live == 0 and not pool._refills
+        await pool.close()
+
+    run(scenario())
+
+
+def test_close_cancels_pending_refills(server_config):
+    async def scenario():
+        pool = make_pool(server_config, 1)
+        await pool.open()
+        agent = await pool.acquire()
+        await pool.release(agent, discard=True)
+        refills = set(pool._refills)
+        await pool.close()
+        await asyncio.gather(*refills, return_exceptions=True)
+        assert all(task.cancelled() for task in refills)
+        assert pool._idle.empty()
+
+    run(scenario())
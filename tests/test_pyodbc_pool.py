@@ -0,0 +1,189 @@
+import asyncio
+
+import pytest
+
+pyodbc = pytest.importorskip("pyodbc")
+pytest.importorskip("fastapi")
+
+import server2
+from server2 import PyodbcPool, _select_batches
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.description = None
+        self.closed = False
+        self._rows = []
+
+    def execute(self, sql, params=()):
+        if not self.conn.alive:
+            raise pyodbc.Error("connection lost")
+        if sql == "SELECT 1":
+            self._rows = [(1,)]
+        else:
+            self.description = [("id",), ("name",)]
+            self._rows = list(self.conn.rows)
+        return self
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+    def fetchmany(self, size):
+        batch, self._rows = self._rows[:size], self._rows[size:]
+        return batch
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnection:
+    def __init__(self, rows=()):
+        self.rows = rows
+        self.alive = True
+        self.closed = False
+        self.cursors = []
+
+    def cursor(self):
+        cursor = FakeCursor(self)
+        self.cursors.append(cursor)
+        return cursor
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def connections(monkeypatch):
+    """Every connection the pool opens, in order"""
+    opened = []
+
+    def connect(connection_string):
+        conn = FakeConnection()
+        opened.append(conn)
+        return conn
+
+    monkeypatch.setattr(server2.pyodbc, "connect", connect)
+    return opened
+
+
+def run(coro, timeout=10):
+    return asyncio.run(asyncio.wait_for(coro, timeout))
+
+
+def test_open_acquire_release(connections):
+    async def scenario():
+        pool = PyodbcPool("dsn", min_size=2, max_size=4)
+        await pool.open()
+        assert pool.size == 2
+        async with pool.acquire() as conn:
+            assert conn is connections[0]
+        async with pool.acquire() as conn:
+            assert conn is connections[1]
+        assert pool.size == 2 and pool._idle.qsize() == 2
+        await pool.close()
+        assert pool.size == 0 and all(conn.closed for conn in connections)
+
+    run(scenario())
+
+
+def test_waits_for_release_at_max_size(connections):
+    async def scenario():
+        pool = PyodbcPool("dsn", min_size=0, max_size=1)
+        async with pool.acquire() as held:
+            waiter = asyncio.create_task(pool.acquire().__aenter__())
+            await asyncio.sleep(0.05)
+            assert not waiter.done()
+        assert await waiter is held
+        assert len(connections) == 1
+
+    run(scenario())
+
+
+def test_dead_connection_is_replaced_by_pre_ping(connections):
+    async def scenario():
+        pool = PyodbcPool("dsn", min_size=1, max_size=1)
+        await pool.open()
+        connections[0].alive = False
+        async with pool.acquire() as conn:
+            assert conn is connections[1]
+        assert connections[0].closed
+        assert pool.size == 1
+
+    run(scenario())
+
+
+def test_cancelled_borrower_frees_its_slot_for_a_waiter(connections):
+    async def scenario():
+        pool = PyodbcPool("dsn", min_size=0, max_size=1)
+        borrowed = asyncio.Event()
+
+        async def borrower():
+            async with pool.acquire():
+                borrowed.set()
+                await asyncio.Event().wait()
+
+        holder = asyncio.create_task(borrower())
+        await borrowed.wait()
+        waiter = asyncio.create_task(pool.acquire().__aenter__())
+        await asyncio.sleep(0.05)
+        holder.cancel()
+        # The cancelled borrower's connection is never handed on
+        assert await waiter is connections[1]
+        assert pool.size == 1
+
+    run(scenario())
+
+
+def test_unreachable_database_yields_none(monkeypatch):
+    def connect(connection_string):
+        raise pyodbc.Error("login timeout")
+
+    monkeypatch.setattr(server2.pyodbc, "connect", connect)
+
+    async def scenario():
+        pool = PyodbcPool("dsn", min_size=0, max_size=2)
+        async with pool.acquire() as conn:
+            assert conn is None
+        assert pool.size == 0
+
+    run(scenario())
+
+
+def test_select_batches_streams_rows_in_batches():
+    conn = FakeConnection(rows=[(1, "a"), (2, "b"), (3, "c")])
+
+    async def scenario():
+        async with _select_batches(conn, "SELECT id, name FROM t", batch_size=2) as (columns, batches):
+            return columns, [batch async for batch in batches]
+
+    assert run(scenario()) == (["id", "name"], [[(1, "a"), (2, "b")], [(3, "c")]])
+    assert conn.cursors[0].closed
+
+
+def test_select_batches_stops_worker_on_early_exit():
+    conn = FakeConnection(rows=[(n, str(n)) for n in range(100)])
+
+    async def scenario():
+        async with _select_batches(conn, "SELECT id, name FROM t", batch_size=2) as (columns, batches):
+            async for batch in batches:
+                return batch
+
+    assert run(scenario()) == [(0, "0"), (1, "1")]
+    cursor = conn.cursors[0]
+    assert cursor.closed
+    # The worker stopped within a few batches of the consumer
+    assert len(cursor._rows) > 80
+
+
+def test_select_batches_raises_query_errors():
+    conn = FakeConnection()
+    conn.alive = False
+
+    async def scenario():
+        async with _select_batches(conn, "SELECT id FROM t"):
+            pass
+
+    with pytest.raises(pyodbc.Error, match="connection lost"):
+        run(scenario())
+    assert conn.cursors[0].closed
@@ -0,0 +1,95 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+
+import pytest
+
+import sql_mcp_agent_python
+from sql_mcp_agent_python import CustomSQLMCPAgent
+
+
+def run(coro, timeout=20):
+    return asyncio.run(asyncio.wait_for(coro, timeout))
+
+
+@asynccontextmanager
+async def started_agent(server_config):
+    agent = CustomSQLMCPAgent(*server_config)
+    await agent.initialize()
+    try:
+        yield agent
+    finally:
+        await agent.close()
+
+
+def tool_args(response):
+    return json.loads(response["result"]["content"][0]["text"])["args"]
+
+
+def test_timed_out_request_is_reaped(server_config, monkeypatch):
+    monkeypatch.setattr(sql_mcp_agent_python, "MCP_REQUEST_TIMEOUT", 0.1)
+
+    async def scenario():
+        async with started_agent(server_config) as agent:
+            with pytest.raises(Exception, match="Request timeout"):
+                await agent._call_tool("hang", {})
+            assert agent.pending_count == 0
+            assert agent._deadlines == []
+
+    run(scenario())
+
+
+def test_late_reply_for_reused_slot_is_ignored(server_config, monkeypatch):
+    # A single slot, so the second request reuses the first one's slot
+    monkeypatch.setattr(sql_mcp_agent_python, "MAX_IN_FLIGHT", 1)
+    monkeypatch.setattr(sql_mcp_agent_python, "MCP_REQUEST_TIMEOUT", 0.1)
+
+    async def scenario():
+        async with started_agent(server_config) as agent:
+            with pytest.raises(Exception, match="Request timeout"):
+                await agent._call_tool("sleep", {"delay": 0.3, "tag": "stale"})
+            monkeypatch.setattr(sql_mcp_agent_python, "MCP_REQUEST_TIMEOUT", 5.0)
+            # The stale reply lands while this request holds the slot
+            response = await agent._call_tool("sleep", {"delay": 0.5, "tag": "fresh"})
+            assert tool_args(response)["tag"] == "fresh"
+            assert agent.pending_count == 0
+
+    run(scenario())
+
+
+def test_encode_failure_frees_slot(server_config):
+    async def scenario():
+        async with started_agent(server_config) as agent:
+            for _ in range(3):
+                with pytest.raises(TypeError):
+                    await agent._call_tool("echo", {"value": object()})
+            assert agent.pending_count == 0
+            assert tool_args(await agent._call_tool("echo", {"n": 1})) == {"n": 1}
+
+    run(scenario())
+
+
+def test_discovery_probes_free_slots_when_slots_run_out(server_config, monkeypatch):
+    monkeypatch.setattr(sql_mcp_agent_python, "MAX_IN_FLIGHT", 2)
+
+    async def scenario():
+        async with started_agent(server_config) as agent:
+            await agent.try_alternative_tool_discovery()
+            assert agent.pending_count == 0
+            assert sorted(agent._free_slots) == [0, 1]
+
+    run(scenario())
+
+
+def test_requests_in_one_tick_share_a_write(server_config, monkeypatch):
+    async def scenario():
+        async with started_agent(server_config) as agent:
+            stdin = agent.mcp_process.stdin
+            writes = []
+            write = stdin.write
+            monkeypatch.setattr(stdin, "write", lambda data: (writes.append(data), write(data)))
+            responses = await asyncio.gather(*(agent._call_tool("echo", {"n": n}) for n in range(3)))
+            assert [tool_args(response) for response in responses] == [{"n": n} for n in range(3)]
+            assert len(writes) == 1
+
+    run(scenario())
@@ -1,10 +1,36 @@
+import ast
+from functools import lru_cache
+
 from fastmcp.tool import Tool
 
+# Arithmetic-only syntax: numbers, tuples and the basic operators
+_ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Constant, ast.Tuple, ast.Load,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow,
+    ast.UAdd, ast.USub,
+)
+
+def _validate(tree: ast.AST):
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ValueError(f"Unsupported syntax: {type(node).__name__}")
+        if isinstance(node, ast.Constant) and (
+            isinstance(node.value, bool) or not isinstance(node.value, (int, float, complex))
+        ):
+            raise ValueError(f"Unsupported constant: {node.value!r}")
+
+@lru_cache(maxsize=1024)
+def _compile(expr: str):
+    """Parse, validate and compile an expression once per unique string"""
+    tree = ast.parse(expr, mode="eval")
+    _validate(tree)
+    return compile(tree, "<calc>", "eval")
+
 class CalculatorTool(Tool):
     def run(self, tool_input: dict, **kwargs):
         expr = tool_input.get("expression", "")
         try:
-            result = eval(expr, {}, {})  # ⚠️ Safe only for demo
+            result = eval(_compile(expr), {"__builtins__": {}}, {})
             return {"result": result}
         except Exception as e:
             return {"error": str(e)}